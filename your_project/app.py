@@ -5,15 +5,23 @@ from pathlib import Path
 from dotenv import load_dotenv
 import io
 import logging
-import re
 
 # Set up logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
 # Import custom modules
-from inventory.filters import load_inventory, filter_products, get_recommendation_reasons
-from llm.handler import parse_query
+from inventory.export import iter_matches, write_csv
+from inventory.filters import load_inventory, filter_products
+from inventory.price_rating_index import PriceRatingIndex
+from inventory.similar import load_similar_items
+from llm.intent_model import load_intent_model
+from search.cache import filters_key
+from search.local_parser import handle_simple_search
+from search.pipeline import run_search
+from search.query_log import QueryLogWriter, load_top_queries, warm_caches
+from search.singleflight import parse_flights, filter_flights
+from search.speculative import SpeculativeSearch
 
 # Load environment variables
 load_dotenv()
@@ -44,6 +52,9 @@ if "search_query" not in st.session_state:
 if "search_summary" not in st.session_state:
     st.session_state.search_summary = None
 
+if "speculative_search" not in st.session_state:
+    st.session_state.speculative_search = SpeculativeSearch(handle_simple_search, filter_products)
+
 
 def create_synthetic_inventory():
     """Create a synthetic inventory dataset when no file is available"""
@@ -267,6 +278,42 @@ def load_default_inventory():
         return create_synthetic_inventory()
 
 
+@st.cache_resource
+def get_shared_inventory():
+    """Load the default inventory once per process and warm the search caches for it"""
+    df = load_default_inventory()
+    try:
+        top_queries = load_top_queries(os.getenv("QUERY_LOG_TOP_QUERIES", "logs/top_queries.json"))
+        warm_caches(top_queries, df, filter_products)
+    except Exception as e:
+        logger.warning(f"Could not warm caches from top queries: {e}")
+    return df
+
+
+@st.cache_resource
+def get_price_index():
+    """Price/rating index over the shared inventory, built once per process"""
+    return PriceRatingIndex(get_shared_inventory())
+
+
+@st.cache_resource
+def get_similar_items():
+    """Precomputed similar-items lists for the shared inventory (built offline), or None"""
+    return load_similar_items(get_shared_inventory())
+
+
+@st.cache_resource
+def get_intent_model():
+    """Distilled query understanding model, or None until one has been trained"""
+    return load_intent_model()
+
+
+@st.cache_resource
+def get_query_log():
+    """Process-wide background writer for the structured query log"""
+    return QueryLogWriter(os.getenv("QUERY_LOG_DIR", "logs/queries"))
+
+
 def show_inventory_overview():
     """Display inventory statistics in the sidebar"""
     if st.session_state.inventory_df is not None:
@@ -297,53 +344,12 @@ def show_inventory_overview():
             st.sidebar.markdown("### Available Categories")
             for cat in categories:
                 st.sidebar.markdown(f"• {cat.title()}")
-
-
-def handle_simple_search(query):
-    """
-    Handle simple keyword searches by inferring filters from basic terms
-    Returns a dictionary with inferred filters
-    """
-    query = query.strip().lower()
-    
-    # Check if the query is just a single category name
-    categories = ['accessory', 'bag', 'blazer', 'blouse', 'cardigan', 'coat', 
-                  'dress', 'hoodie', 'jacket', 'jeans', 'shoes', 'skirt', 
-                  'sweater', 'tshirt', 'socks']
-    
-    # Handle plural forms by removing trailing 's'
-    search_term = query.rstrip('s')
-    
-    # Check for exact category match
-    if search_term in categories:
-        logger.info(f"Simple search matched category: {search_term}")
-        return {"category": search_term}
-    
-    # Check for partial category match
-    for category in categories:
-        if search_term in category or category in search_term:
-            logger.info(f"Simple search partially matched category: {category}")
-            return {"category": category}
-    
-    # Check for color matches
-    colors = ['red', 'blue', 'green', 'black', 'white', 'pink', 
-              'purple', 'yellow', 'orange', 'brown', 'gray', 'beige']
-    
-    for color in colors:
-        if color in query:
-            logger.info(f"Simple search matched color: {color}")
-            return {"color": color}
-    
-    # Try to extract price information
-    price_pattern = r'under\s*\$?(\d+)'
-    match = re.search(price_pattern, query)
-    if match:
-        price = float(match.group(1))
-        logger.info(f"Simple search matched price under: ${price}")
-        return {"price_max": price}
-    
-    # If nothing matches, return None to indicate the basic search failed
-    return None
+        
+        # Searches answered by an identical search already running in another session
+        parse_stats, filter_stats = parse_flights.stats(), filter_flights.stats()
+        st.sidebar.caption(
+            f"Shared in-flight searches: {parse_stats['collapsed']} parses, {filter_stats['collapsed']} filters"
+        )
 
 
 def process_search_query(query):
@@ -353,59 +359,42 @@ def process_search_query(query):
         if st.session_state.inventory_df is None:
             logger.warning("Inventory data not loaded when attempting search")
             # Try to load default inventory as a fallback
-            st.session_state.inventory_df = load_default_inventory()
+            st.session_state.inventory_df = get_shared_inventory()
             
             # If still None, show error and return
             if st.session_state.inventory_df is None:
                 st.error("Inventory data not loaded. Please try again.")
                 return None
         
-        # First try to handle as a simple keyword search
-        simple_filters = handle_simple_search(query)
+        # Parse, filter and build cards exactly as the load test harness does
+        result = run_search(
+            query,
+            st.session_state.inventory_df,
+            speculative=st.session_state.speculative_search,
+            intent_model=get_intent_model(),
+            price_index=get_price_index()
+        )
+        filters, filtered_df = result["filters"], result["filtered_df"]
+        
+        if not filters:
+            log_search(query, None, result["source"], result["timings_ms"], 0)
+            st.warning("I couldn't understand your request. Please try specifying product type, color, or price range more clearly.")
+            return None
         
-        # If simple search returned filters, use those
-        if simple_filters:
-            filters = simple_filters
+        if result["source"] == "local":
             st.session_state.search_summary = f"Searching for: Category: {filters.get('category', '')}{filters.get('color', '')}"
-            logger.info(f"Using simple search filters: {filters}")
-        else:
-            # Otherwise try the LLM for natural language understanding
-            filters = parse_query(query)
-            
-            if not filters:
-                st.warning("I couldn't understand your request. Please try specifying product type, color, or price range more clearly.")
-                return None
-        
         st.session_state.last_filters = filters
         
-        # Filter products
-        filtered_df = filter_products(st.session_state.inventory_df, filters)
-        
         if len(filtered_df) == 0:
+            log_search(query, filters, result["source"], result["timings_ms"], 0)
             st.warning(f"No products found matching your criteria.")
             return None
         
         # Create search summary for display
         create_search_insight(filtered_df, filters)
         
-        # Generate product cards for display
-        product_cards = []
-        for _, row in filtered_df.iterrows():
-            product = row.to_dict()
-            reason = get_recommendation_reasons(product, filters)
-            
-            product_cards.append({
-                "id": product.get('id', 0),
-                "name": product.get('name', 'Unknown Product'),
-                "price": product.get('price', 0),
-                "image_url": product.get('image_url', ''),
-                "reason": reason,
-                "color": product.get('color', 'N/A'),
-                "category": product.get('category', 'N/A'),
-                "rating": product.get('rating', 0)
-            })
-        
-        return product_cards
+        log_search(query, filters, result["source"], result["timings_ms"], len(result["cards"]))
+        return result["cards"]
     
     except Exception as e:
         logger.exception(f"Error processing search query: {e}")
@@ -413,6 +402,20 @@ def process_search_query(query):
         return None
 
 
+def log_search(query, filters, source, timings, result_count):
+    """Hand a search record to the background query log writer"""
+    try:
+        get_query_log().log({
+            "query": query,
+            "filters": filters,
+            "source": source,
+            "timings_ms": {k: round(v, 3) for k, v in timings.items()},
+            "result_count": result_count
+        })
+    except Exception as e:
+        logger.warning(f"Could not log search query: {e}")
+
+
 def create_search_insight(filtered_df, filters):
     """Create search insight summary based on filtered results"""
     if filtered_df is None or len(filtered_df) == 0:
@@ -454,6 +457,8 @@ def display_search_results(products):
     if not products:
         return
     
+    similar_items = get_similar_items()
+
     # Display results in a 3-column grid
     cols = st.columns(3)
     
@@ -472,12 +477,60 @@ def display_search_results(products):
                 st.markdown(f"### {product['name']}")
                 st.markdown(f"**${product['price']:.2f}** • {product.get('color', 'N/A').title()} • {product.get('rating', 0)} ⭐")
                 st.info(f"**Why this matches**: {product['reason']}")
+                show_similar_products(product, similar_items)
+
+
+def show_similar_products(product, similar_items, k=3):
+    """Show precomputed alternatives for a product card"""
+    if similar_items is None:
+        return
+    product_id = similar_items.product_id(product.get('name'), product.get('category'), product.get('color'))
+    if product_id is None:
+        return
+    neighbours = similar_items.similar_products(product_id, k)
+    if len(neighbours) == 0:
+        return
+
+    with st.expander("Similar items"):
+        for _, row in st.session_state.inventory_df.iloc[neighbours].iterrows():
+            color = row['color'].title() if isinstance(row.get('color'), str) else 'N/A'
+            st.markdown(f"- **{row['name']}** • ${row['price']:.2f} • {color}")
+
+
+def show_export_button():
+    """Offer every product matching the last search as a CSV download"""
+    df = st.session_state.inventory_df
+    if df is None:
+        return
+    filters = st.session_state.last_filters or {}
+    export_key = (id(df), filters_key(filters))
+    cached = st.session_state.get("export_csv")
+    if cached is None or cached[0] != export_key:
+        buffer = io.StringIO()
+        write_csv(iter_matches(df, filters), buffer)
+        cached = (export_key, buffer.getvalue())
+        st.session_state.export_csv = cached
+
+    st.download_button(
+        "⬇️ Download results (CSV)",
+        data=cached[1],
+        file_name="search_results.csv",
+        mime="text/csv"
+    )
+
+
+def schedule_speculative_search():
+    """Start speculative parsing and filtering for the current search input"""
+    st.session_state.speculative_search.update(
+        st.session_state.get("search_input", ""),
+        st.session_state.inventory_df
+    )
 
 
 def main():
     # Load inventory if not already loaded
     if st.session_state.inventory_df is None:
-        st.session_state.inventory_df = load_default_inventory()
+        st.session_state.inventory_df = get_shared_inventory()
         # Log inventory loading status
         if st.session_state.inventory_df is not None:
             logger.info(f"Loaded inventory with {len(st.session_state.inventory_df)} products")
@@ -502,7 +555,8 @@ def main():
         search_query = st.text_input(
             "What are you looking for?", 
             placeholder="e.g., Show me red dresses under $200",
-            key="search_input"
+            key="search_input",
+            on_change=schedule_speculative_search
         )
     
     with col2:
@@ -559,6 +613,7 @@ def main():
     # Display search results
     if st.session_state.search_results:
         st.markdown(f"## 🎯 Found {len(st.session_state.search_results)} Products")
+        show_export_button()
         display_search_results(st.session_state.search_results)
 
 
@@ -0,0 +1,199 @@
+import os
+import hashlib
+import logging
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor, wait, FIRST_COMPLETED
+from typing import Callable, Iterator, List, Optional
+
+import pandas as pd
+
+# Set up logging
+logger = logging.getLogger(__name__)
+
+ProgressCallback = Callable[[str, int], None]
+
+# Bump whenever the conversion or validation output changes, so stale cache entries are ignored
+INVENTORY_CACHE_VERSION = 1
+
+
+def file_hash(file_path: str, block_size: int = 1024 * 1024) -> str:
+    """
+    SHA-256 of a file's contents, read in blocks
+    """
+    digest = hashlib.sha256()
+    with open(file_path, 'rb') as f:
+        for block in iter(lambda: f.read(block_size), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def _log_progress(sheet_name: str, rows: int) -> None:
+    logger.info(f"Excel ingestion: sheet '{sheet_name}' {rows} rows read")
+
+
+class _CallbackQueue:
+    """Queue stand-in that reports progress immediately when reading in-process"""
+
+    def __init__(self, callback: ProgressCallback):
+        self.callback = callback
+
+    def put(self, item) -> None:
+        self.callback(*item)
+
+
+def _sheet_chunks(workbook, sheet_name: str, chunk_rows: int) -> Iterator[pd.DataFrame]:
+    """
+    Yield one worksheet as DataFrames of at most chunk_rows rows
+
+    Headers are stripped and lower-cased as validate_inventory does, so sheets
+    whose headers differ only in case line up when concatenated. A sheet with
+    only a header yields one empty frame with its columns; a blank sheet yields nothing.
+    """
+    rows = workbook[sheet_name].iter_rows(values_only=True)
+    header = next(rows, None)
+    if header is None:
+        return
+
+    columns = [str(h).strip().lower() if h is not None else f"column_{i}" for i, h in enumerate(header)]
+    width = len(columns)
+    buffer = []
+    yielded = False
+    for row in rows:
+        if len(row) != width:
+            row = tuple(row[:width]) + (None,) * (width - len(row))
+        buffer.append(row)
+        if len(buffer) >= chunk_rows:
+            yield pd.DataFrame.from_records(buffer, columns=columns)
+            buffer = []
+            yielded = True
+    if buffer or not yielded:
+        yield pd.DataFrame.from_records(buffer, columns=columns)
+
+
+def _read_sheet(file_path: str, sheet_name: str, chunk_rows: int, progress_queue=None) -> pd.DataFrame:
+    """
+    Read one worksheet row by row in openpyxl's read-only streaming mode
+    """
+    import openpyxl
+
+    workbook = openpyxl.load_workbook(file_path, read_only=True, data_only=True)
+    try:
+        chunks: List[pd.DataFrame] = []
+        done = 0
+        for chunk in _sheet_chunks(workbook, sheet_name, chunk_rows):
+            chunks.append(chunk)
+            done += len(chunk)
+            if progress_queue is not None and len(chunk):
+                progress_queue.put((sheet_name, done))
+
+        if not chunks:
+            return pd.DataFrame()
+        return pd.concat(chunks, ignore_index=True)
+    finally:
+        workbook.close()
+
+
+def iter_excel_chunks(file_path: str, chunk_rows: int = 50_000) -> Iterator[pd.DataFrame]:
+    """
+    Stream the rows of every sheet of an .xlsx workbook, in workbook order
+
+    Only one chunk of at most chunk_rows rows is held in memory at a time.
+    Chunks are not validated; empty sheets are skipped.
+    """
+    import openpyxl
+
+    workbook = openpyxl.load_workbook(file_path, read_only=True, data_only=True)
+    try:
+        for sheet_name in workbook.sheetnames:
+            for chunk in _sheet_chunks(workbook, sheet_name, chunk_rows):
+                if len(chunk):
+                    yield chunk
+    finally:
+        workbook.close()
+
+
+def read_excel_streaming(
+    file_path: str,
+    workers: Optional[int] = None,
+    chunk_rows: int = 50_000,
+    progress: Optional[ProgressCallback] = None,
+) -> pd.DataFrame:
+    """
+    Read every sheet of an .xlsx workbook into one DataFrame
+
+    Sheets are streamed row by row in read-only mode and parsed in parallel
+    worker processes, one sheet per worker. Workers are spawned rather than
+    forked, so the caller's threads and locks (e.g. Streamlit's) are not
+    copied into them. Sheets are concatenated in workbook order.
+
+    Parameters:
+    - file_path: Path to the .xlsx workbook
+    - workers: Maximum worker processes (defaults to the CPU count)
+    - chunk_rows: Rows buffered per chunk before converting to a DataFrame
+    - progress: Callback receiving (sheet_name, rows_read_so_far) per chunk
+
+    Returns:
+    - DataFrame with the rows of all non-empty sheets
+    """
+    import openpyxl
+
+    progress = progress or _log_progress
+    workbook = openpyxl.load_workbook(file_path, read_only=True)
+    sheet_names = workbook.sheetnames
+    workbook.close()
+
+    workers = min(workers or os.cpu_count() or 1, len(sheet_names))
+
+    if workers <= 1:
+        progress_queue = _CallbackQueue(progress)
+        frames = [_read_sheet(file_path, name, chunk_rows, progress_queue) for name in sheet_names]
+    else:
+        context = multiprocessing.get_context("spawn")
+        with context.Manager() as manager:
+            progress_queue = manager.Queue()
+            with ProcessPoolExecutor(max_workers=workers, mp_context=context) as pool:
+                futures = [pool.submit(_read_sheet, file_path, name, chunk_rows, progress_queue)
+                           for name in sheet_names]
+                pending = set(futures)
+                while pending:
+                    _, pending = wait(pending, timeout=0.2, return_when=FIRST_COMPLETED)
+                    while not progress_queue.empty():
+                        progress(*progress_queue.get())
+                frames = [f.result() for f in futures]
+
+    frames = [f for f in frames if len(f.columns) > 0 and len(f) > 0]
+    if not frames:
+        return pd.DataFrame()
+    return pd.concat(frames, ignore_index=True)
+
+
+def load_cached(file_path: str, loader: Callable[[str], pd.DataFrame], cache_dir: Optional[str] = None) -> pd.DataFrame:
+    """
+    Load a file through `loader`, caching the converted result by content hash
+
+    Re-uploading the same file (under any name) is served from the cache. The
+    key also carries INVENTORY_CACHE_VERSION and the pandas version, so entries
+    written by older conversion code or another pandas are not reused.
+    """
+    cache_dir = cache_dir or os.getenv("INVENTORY_CACHE_DIR", ".cache/inventory")
+    cache_key = f"{file_hash(file_path)}-v{INVENTORY_CACHE_VERSION}-pandas{pd.__version__}"
+    cache_path = os.path.join(cache_dir, f"{cache_key}.pkl")
+
+    if os.path.exists(cache_path):
+        try:
+            logger.info(f"Loading {file_path} from conversion cache")
+            return pd.read_pickle(cache_path)
+        except Exception as e:
+            logger.warning(f"Ignoring unreadable inventory cache {cache_path}: {e}")
+
+    df = loader(file_path)
+
+    try:
+        os.makedirs(cache_dir, exist_ok=True)
+        tmp_path = f"{cache_path}.{os.getpid()}.tmp"
+        df.to_pickle(tmp_path)
+        os.replace(tmp_path, cache_path)
+    except Exception as e:
+        logger.warning(f"Could not write inventory cache {cache_path}: {e}")
+
+    return df
@@ -0,0 +1,204 @@
+import os
+import json
+import contextlib
+import logging
+import argparse
+from typing import Dict, List, Any, Iterable, Iterator, Optional, Union
+
+import pandas as pd
+
+from inventory.filters import (
+    NUMERIC_COLUMNS, load_inventory, validate_inventory, filter_products, get_recommendation_reasons,
+)
+
+# Set up logging
+logger = logging.getLogger(__name__)
+
+DEFAULT_CHUNKSIZE = 50_000
+
+EXPORT_FORMATS = {".csv": "csv", ".jsonl": "jsonl", ".json": "jsonl", ".parquet": "parquet"}
+
+
+def _iter_inventory(source: Union[str, pd.DataFrame], chunksize: int) -> Iterator[pd.DataFrame]:
+    if isinstance(source, pd.DataFrame):
+        for start in range(0, len(source), chunksize):
+            yield source.iloc[start:start + chunksize]
+        return
+
+    _, ext = os.path.splitext(source)
+    if ext.lower() == '.csv':
+        # Types inferred per chunk can differ between chunks (e.g. '1' then 'X3'),
+        # so read text as is and let validation coerce the numeric columns
+        for chunk in pd.read_csv(source, chunksize=chunksize, dtype=str):
+            yield validate_inventory(chunk)
+    else:
+        # Excel workbooks are converted (and cached) as a whole by the regular loader
+        df = load_inventory(source)
+        for start in range(0, len(df), chunksize):
+            yield df.iloc[start:start + chunksize]
+
+
+def iter_matches(
+    source: Union[str, pd.DataFrame],
+    filters: Dict[str, Any],
+    chunksize: int = DEFAULT_CHUNKSIZE,
+) -> Iterator[pd.DataFrame]:
+    """
+    Stream the products matching a filter dictionary, with their recommendation reasons
+
+    Parameters:
+    - source: Inventory DataFrame, or any file load_inventory supports
+      (CSV files are read chunk by chunk and never loaded whole; every
+      column except price and rating is then kept as text)
+    - filters: Filter dictionary, as produced by the query parsers
+    - chunksize: Inventory rows examined per chunk
+
+    Returns:
+    - Generator of DataFrames holding the matching rows of each chunk plus
+      a "reason" column; chunks without matches are skipped
+    """
+    for chunk in _iter_inventory(source, chunksize):
+        matches = filter_products(chunk, filters)
+        if matches.empty:
+            continue
+        matches = matches.reset_index(drop=True)
+        matches['reason'] = [get_recommendation_reasons(product, filters)
+                             for product in matches.to_dict('records')]
+        yield matches
+
+
+def _open_text(output):
+    # Paths are opened (and closed) here; file objects are written to as given
+    if hasattr(output, 'write'):
+        return contextlib.nullcontext(output)
+    return open(output, 'w', encoding='utf-8', newline='')
+
+
+def write_csv(chunks: Iterable[pd.DataFrame], output) -> int:
+    """
+    Write chunks to a CSV path or text file object; returns the row count
+    """
+    rows = 0
+    with _open_text(output) as f:
+        for chunk in chunks:
+            chunk.to_csv(f, header=rows == 0, index=False)
+            rows += len(chunk)
+    return rows
+
+
+def write_jsonl(chunks: Iterable[pd.DataFrame], output) -> int:
+    """
+    Write chunks as one JSON object per line to a path or text file object; returns the row count
+    """
+    rows = 0
+    with _open_text(output) as f:
+        for chunk in chunks:
+            f.write(chunk.to_json(orient='records', lines=True, date_format='iso'))
+            rows += len(chunk)
+    return rows
+
+
+def write_parquet(chunks: Iterable[pd.DataFrame], output: str) -> int:
+    """
+    Write chunks as row groups of one Parquet file (requires pyarrow); returns the row count
+
+    The schema is taken from the first chunk, with every object column typed
+    as string (values converted with str()) and price/rating as float64, so a
+    chunk that is all missing, holds numbers in a text column or only whole
+    prices cannot fix a type later chunks break. Later chunks are cast to the
+    schema.
+    """
+    try:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+    except ImportError:
+        raise ImportError("Parquet export requires pyarrow (pip install pyarrow)")
+
+    rows = 0
+    writer = None
+    schema = None
+    try:
+        for chunk in chunks:
+            text_columns = [col for col in chunk.columns if chunk[col].dtype == object]
+            numeric_columns = [col for col in NUMERIC_COLUMNS if col in chunk.columns]
+            chunk = chunk.copy()
+            for col in text_columns:
+                chunk[col] = chunk[col].map(lambda v: v if v is None or isinstance(v, str) or pd.isna(v) else str(v))
+            for col in numeric_columns:
+                chunk[col] = pd.to_numeric(chunk[col], errors='coerce').astype('float64')
+            if writer is None:
+                schema = pa.Schema.from_pandas(chunk, preserve_index=False)
+                for col in text_columns:
+                    i = schema.get_field_index(col)
+                    schema = schema.set(i, schema.field(i).with_type(pa.string()))
+                writer = pq.ParquetWriter(output, schema)
+            writer.write_table(pa.Table.from_pandas(chunk, schema=schema, preserve_index=False))
+            rows += len(chunk)
+    finally:
+        if writer is not None:
+            writer.close()
+    if writer is None:
+        # No matches: still leave a valid (empty) file behind
+        pq.write_table(pa.table({}), output)
+    return rows
+
+
+WRITERS = {"csv": write_csv, "jsonl": write_jsonl, "parquet": write_parquet}
+
+
+def export_results(
+    source: Union[str, pd.DataFrame],
+    filters: Dict[str, Any],
+    output: str,
+    fmt: Optional[str] = None,
+    chunksize: int = DEFAULT_CHUNKSIZE,
+) -> int:
+    """
+    Export every product matching `filters` to a CSV, JSONL or Parquet file
+
+    Parameters:
+    - source: Inventory DataFrame or file path
+    - filters: Filter dictionary
+    - output: Destination path; written to a temporary file and renamed when complete
+    - fmt: "csv", "jsonl" or "parquet" (inferred from the output extension when omitted)
+    - chunksize: Inventory rows processed at a time, which bounds memory use
+
+    Returns:
+    - Number of rows exported
+    """
+    if fmt is None:
+        fmt = EXPORT_FORMATS.get(os.path.splitext(output)[1].lower())
+    if fmt not in WRITERS:
+        raise ValueError(f"Unsupported export format: {fmt or output}")
+
+    directory = os.path.dirname(output)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    tmp_path = f"{output}.{os.getpid()}.tmp"
+    try:
+        rows = WRITERS[fmt](iter_matches(source, filters, chunksize), tmp_path)
+        os.replace(tmp_path, output)
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+
+    logger.info(f"Exported {rows} products to {output}")
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Export the products matching a filter to CSV, JSONL or Parquet")
+    parser.add_argument("inventory", help="Inventory file (CSV or Excel)")
+    parser.add_argument("-o", "--output", required=True, help="Output path (.csv, .jsonl or .parquet)")
+    parser.add_argument("--filters", default="{}", help='Filter dictionary as JSON, e.g. \'{"category": "dress"}\'')
+    parser.add_argument("--format", choices=sorted(WRITERS), default=None)
+    parser.add_argument("--chunksize", type=int, default=DEFAULT_CHUNKSIZE)
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    rows = export_results(args.inventory, json.loads(args.filters), args.output, args.format, args.chunksize)
+    print(f"Exported {rows} products to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
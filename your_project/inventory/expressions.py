@@ -0,0 +1,361 @@
+from abc import ABC, abstractmethod
+from typing import Dict, List, Any, Optional, Sequence, Union
+
+import numpy as np
+import pandas as pd
+
+# Columns searched by a bare `contains` predicate
+TEXT_COLUMNS = ('name', 'description')
+
+# Fallback selectivity for predicates we cannot estimate from statistics
+DEFAULT_SELECTIVITY = 0.25
+
+# Rows sampled to estimate predicate selectivity
+SAMPLE_ROWS = 4096
+
+
+class Expr(ABC):
+    """Base class for filter expressions"""
+
+    @abstractmethod
+    def to_dict(self) -> Dict[str, Any]:
+        """Serialize back to the dictionary form accepted by parse_expression"""
+
+
+class Eq(Expr):
+    """column == value (strings compared case-insensitively)"""
+
+    def __init__(self, column: str, value: Any):
+        self.column = column
+        self.value = value
+
+    def to_dict(self):
+        return {"field": self.column, "eq": self.value}
+
+
+class In(Expr):
+    """column is one of values (strings compared case-insensitively)"""
+
+    def __init__(self, column: str, values: Sequence[Any]):
+        self.column = column
+        self.values = list(values)
+
+    def to_dict(self):
+        return {"field": self.column, "in": self.values}
+
+
+class Range(Expr):
+    """min <= column <= max on a numeric column; either bound may be None"""
+
+    def __init__(self, column: str, min: Optional[float] = None, max: Optional[float] = None):
+        self.column = column
+        self.min = min
+        self.max = max
+
+    def to_dict(self):
+        d = {"field": self.column}
+        if self.min is not None:
+            d["min"] = self.min
+        if self.max is not None:
+            d["max"] = self.max
+        return d
+
+
+class Contains(Expr):
+    """Case-insensitive substring match on one or more text columns"""
+
+    def __init__(self, columns: Sequence[str], text: str):
+        self.columns = list(columns)
+        self.text = text
+
+    def to_dict(self):
+        field = self.columns[0] if len(self.columns) == 1 else self.columns
+        return {"field": field, "contains": self.text}
+
+
+class And(Expr):
+    def __init__(self, children: Sequence[Expr]):
+        self.children = list(children)
+
+    def to_dict(self):
+        return {"and": [c.to_dict() for c in self.children]}
+
+
+class Or(Expr):
+    def __init__(self, children: Sequence[Expr]):
+        self.children = list(children)
+
+    def to_dict(self):
+        return {"or": [c.to_dict() for c in self.children]}
+
+
+class Not(Expr):
+    def __init__(self, child: Expr):
+        self.child = child
+
+    def to_dict(self):
+        return {"not": self.child.to_dict()}
+
+
+def parse_expression(obj: Any) -> Expr:
+    """
+    Build an expression from its JSON form
+
+    Supported forms:
+    - {"and": [...]}, {"or": [...]}, {"not": {...}}
+    - {"field": "color", "eq": "red"}
+    - {"field": "color", "in": ["red", "blue"]}
+    - {"field": "price", "min": 50, "max": 200}
+    - {"field": "name", "contains": "leather"} (field may be a list, or omitted for name/description)
+
+    Raises ValueError for anything else.
+    """
+    if isinstance(obj, Expr):
+        return obj
+    if not isinstance(obj, dict):
+        raise ValueError(f"Filter expression must be an object, got {type(obj).__name__}")
+
+    if "and" in obj or "or" in obj:
+        op = "and" if "and" in obj else "or"
+        children = obj[op]
+        if not isinstance(children, list) or not children:
+            raise ValueError(f"'{op}' needs a non-empty list of expressions")
+        parsed = [parse_expression(c) for c in children]
+        return And(parsed) if op == "and" else Or(parsed)
+
+    if "not" in obj:
+        return Not(parse_expression(obj["not"]))
+
+    field = obj.get("field")
+    if "contains" in obj:
+        columns = field if isinstance(field, list) else [field] if field else list(TEXT_COLUMNS)
+        return Contains(columns, str(obj["contains"]))
+
+    if not isinstance(field, str) or not field:
+        raise ValueError(f"Predicate needs a 'field': {obj}")
+
+    if "eq" in obj:
+        return Eq(field, obj["eq"])
+    if "in" in obj:
+        values = obj["in"]
+        if not isinstance(values, list):
+            values = [values]
+        return In(field, values)
+    if "min" in obj or "max" in obj:
+        try:
+            low = float(obj["min"]) if obj.get("min") is not None else None
+            high = float(obj["max"]) if obj.get("max") is not None else None
+        except (TypeError, ValueError):
+            raise ValueError(f"Range bounds must be numeric: {obj}")
+        return Range(field, low, high)
+
+    raise ValueError(f"Unsupported filter expression: {obj}")
+
+
+def compile_filters(filters: Union[Dict[str, Any], Expr, None]) -> Optional[Expr]:
+    """
+    Convert a filter dictionary (see filter_products) into an expression
+
+    The classic keys become ANDed predicates; an optional "expression" key
+    holding the JSON form is ANDed with them. Returns None when there is
+    nothing to filter on.
+    """
+    if filters is None:
+        return None
+    if isinstance(filters, Expr):
+        return filters
+
+    parts: List[Expr] = []
+    for column in ('category', 'color'):
+        if column in filters and filters[column]:
+            values = filters[column] if isinstance(filters[column], list) else [filters[column]]
+            parts.append(Eq(column, values[0]) if len(values) == 1 else In(column, values))
+
+    low = filters.get('price_min')
+    high = filters.get('price_max')
+    if low is not None or high is not None:
+        parts.append(Range('price', low, high))
+
+    if filters.get('min_rating') is not None:
+        parts.append(Range('rating', filters['min_rating'], None))
+
+    if filters.get('expression'):
+        parts.append(parse_expression(filters['expression']))
+
+    if not parts:
+        return None
+    return parts[0] if len(parts) == 1 else And(parts)
+
+
+def _normalize_value(value):
+    return value.lower() if isinstance(value, str) else value
+
+
+class _ColumnData:
+    """
+    Column access for one filtering call
+
+    Nothing is cached between calls: values are read from the frame as it is
+    now, and only for the candidate rows a predicate is evaluated on.
+    Selectivities are estimated on an evenly spaced sample of rows.
+    """
+
+    def __init__(self, df: pd.DataFrame):
+        self.df = df
+        self.n = len(df)
+        self.sample = np.arange(0, self.n, max(1, self.n // SAMPLE_ROWS))
+
+    def has(self, column: str) -> bool:
+        return column in self.df.columns
+
+    def _values(self, column: str, rows: np.ndarray) -> pd.Series:
+        series = self.df[column]
+        return series if len(rows) == self.n else series.iloc[rows]
+
+    def matches(self, column: str, values: Sequence[Any], rows: np.ndarray) -> np.ndarray:
+        """Rows whose value is one of `values` (strings compared case-insensitively)"""
+        if not self.has(column):
+            return np.zeros(len(rows), dtype=bool)
+        # Lower-case the distinct values rather than every row
+        codes, uniques = pd.factorize(self._values(column, rows))
+        wanted = {_normalize_value(v) for v in values}
+        hit = np.fromiter((_normalize_value(u) in wanted for u in uniques), dtype=bool, count=len(uniques))
+        return np.append(hit, False)[codes]
+
+    def numeric(self, column: str, rows: np.ndarray) -> np.ndarray:
+        """Values as float64 (NaN where missing or not numeric)"""
+        if not self.has(column):
+            return np.full(len(rows), np.nan)
+        return pd.to_numeric(self._values(column, rows), errors='coerce').to_numpy(dtype='float64')
+
+    def text(self, column: str, rows: np.ndarray) -> np.ndarray:
+        return self._values(column, rows).fillna('').astype(str).str.lower().to_numpy()
+
+
+class FilterPlan:
+    """
+    Executable plan for an expression over one inventory
+
+    ANDs evaluate their children most-selective first and only test later
+    children on the rows that survived; ORs evaluate the broadest child first
+    and only test the others on rows not yet matched. Each predicate is one
+    vectorized pass over the current candidate rows; equality and IN
+    lower-case only the distinct values among them. Predicates on columns the
+    inventory lacks match nothing, like `contains` does.
+    """
+
+    def __init__(self, expr: Expr, data: _ColumnData):
+        self.expr = expr
+        self.data = data
+        self._selectivity: Dict[int, tuple] = {}
+
+    def selectivity(self, expr: Expr) -> float:
+        """Estimated fraction of rows matching `expr`"""
+        # The expression is kept with its estimate so a reused id() cannot alias it
+        entry = self._selectivity.get(id(expr))
+        if entry is None or entry[0] is not expr:
+            entry = (expr, self._estimate(expr))
+            self._selectivity[id(expr)] = entry
+        return entry[1]
+
+    def _estimate(self, expr: Expr) -> float:
+        data = self.data
+        if data.n == 0:
+            return 0.0
+        if isinstance(expr, (Eq, In, Range)):
+            return float(self._eval(expr, data.sample).mean())
+        if isinstance(expr, Contains):
+            return DEFAULT_SELECTIVITY
+        if isinstance(expr, And):
+            return float(np.prod([self.selectivity(c) for c in expr.children]))
+        if isinstance(expr, Or):
+            return 1.0 - float(np.prod([1.0 - self.selectivity(c) for c in expr.children]))
+        if isinstance(expr, Not):
+            return 1.0 - self.selectivity(expr.child)
+        raise ValueError(f"Unknown expression: {expr!r}")
+
+    def evaluate(self) -> np.ndarray:
+        """Boolean mask over the inventory rows"""
+        return self._eval(self.expr, np.arange(self.data.n))
+
+    def describe(self, expr: Optional[Expr] = None, depth: int = 0) -> List[str]:
+        """Human-readable plan with estimated selectivities, in evaluation order"""
+        expr = expr or self.expr
+        line = f"{'  ' * depth}{type(expr).__name__} ~{self.selectivity(expr):.3f}"
+        if isinstance(expr, (And, Or)):
+            lines = [line]
+            for child in self._ordered(expr):
+                lines.extend(self.describe(child, depth + 1))
+            return lines
+        if isinstance(expr, Not):
+            return [line] + self.describe(expr.child, depth + 1)
+        return [f"{line} {expr.to_dict()}"]
+
+    def _ordered(self, expr: Expr) -> List[Expr]:
+        # AND: most selective first; OR: broadest first
+        return sorted(expr.children, key=self.selectivity, reverse=isinstance(expr, Or))
+
+    def _eval(self, expr: Expr, rows: np.ndarray) -> np.ndarray:
+        """Evaluate `expr` on the given row positions; returns a mask aligned with `rows`"""
+        data = self.data
+        if len(rows) == 0:
+            return np.zeros(0, dtype=bool)
+
+        if isinstance(expr, (Eq, In)):
+            values = [expr.value] if isinstance(expr, Eq) else expr.values
+            return data.matches(expr.column, values, rows)
+
+        if isinstance(expr, Range):
+            subset = data.numeric(expr.column, rows)
+            result = ~np.isnan(subset)
+            if expr.min is not None:
+                result &= subset >= expr.min
+            if expr.max is not None:
+                result &= subset <= expr.max
+            return result
+
+        if isinstance(expr, Contains):
+            needle = expr.text.lower()
+            result = np.zeros(len(rows), dtype=bool)
+            for column in expr.columns:
+                if data.has(column):
+                    texts = data.text(column, rows)
+                    result |= np.fromiter((needle in t for t in texts), dtype=bool, count=len(rows))
+            return result
+
+        if isinstance(expr, And):
+            result = np.ones(len(rows), dtype=bool)
+            positions = np.arange(len(rows))
+            for child in self._ordered(expr):
+                matched = self._eval(child, rows[positions])
+                result[positions[~matched]] = False
+                positions = positions[matched]
+                if len(positions) == 0:
+                    break
+            return result
+
+        if isinstance(expr, Or):
+            result = np.zeros(len(rows), dtype=bool)
+            positions = np.arange(len(rows))
+            for child in self._ordered(expr):
+                matched = self._eval(child, rows[positions])
+                result[positions[matched]] = True
+                positions = positions[~matched]
+                if len(positions) == 0:
+                    break
+            return result
+
+        if isinstance(expr, Not):
+            return ~self._eval(expr.child, rows)
+
+        raise ValueError(f"Unknown expression: {expr!r}")
+
+
+def plan_filters(df: pd.DataFrame, filters: Union[Dict[str, Any], Expr]) -> Optional[FilterPlan]:
+    """
+    Compile filters for an inventory; None means every row matches
+    """
+    expr = compile_filters(filters)
+    if expr is None:
+        return None
+    return FilterPlan(expr, _ColumnData(df))
@@ -2,19 +2,58 @@ import pandas as pd
 import os
 from typing import Dict, List, Any, Optional
 
-def load_inventory(file_path: str) -> pd.DataFrame:
+from inventory.expressions import plan_filters
+from inventory.price_rating_index import WELL_UNDER_BUDGET_RATIO
+
+REQUIRED_COLUMNS = ['name', 'category', 'price']
+NUMERIC_COLUMNS = ['price', 'rating']
+
+def load_inventory(file_path: str, progress=None) -> pd.DataFrame:
     """
     Load product inventory from CSV or Excel file
+    
+    Excel workbooks are streamed sheet by sheet in parallel and the converted
+    result is cached by file hash, so re-uploading the same workbook is instant.
+    `progress` receives (sheet_name, rows_read) while a workbook is read.
     """
     _, ext = os.path.splitext(file_path)
     
     if ext.lower() == '.csv':
-        return pd.read_csv(file_path)
-    elif ext.lower() in ['.xlsx', '.xls']:
-        return pd.read_excel(file_path)
+        return validate_inventory(pd.read_csv(file_path))
+    elif ext.lower() == '.xlsx':
+        # Workbooks are validated once, before caching, so a cache hit is returned as is
+        from inventory.excel import load_cached, read_excel_streaming
+        return load_cached(file_path, lambda path: validate_inventory(read_excel_streaming(path, progress=progress)))
+    elif ext.lower() == '.xls':
+        # Legacy .xls cannot be streamed by openpyxl; convert once and cache
+        from inventory.excel import load_cached
+        return load_cached(file_path, lambda path: validate_inventory(pd.read_excel(path)))
     else:
         raise ValueError(f"Unsupported file format: {ext}")
 
+def validate_inventory(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Normalize a freshly loaded inventory so every source yields the same columns and types
+    
+    - Column names are stripped and lower-cased
+    - Fully empty rows (common at the end of spreadsheets) are dropped
+    - price and rating are coerced to numbers
+    
+    Raises ValueError if a required column is missing.
+    """
+    df = df.rename(columns=lambda c: str(c).strip().lower())
+    df = df.dropna(how='all').reset_index(drop=True)
+    
+    missing = [c for c in REQUIRED_COLUMNS if c not in df.columns]
+    if missing:
+        raise ValueError(f"Inventory is missing required columns: {', '.join(missing)}")
+    
+    for col in NUMERIC_COLUMNS:
+        if col in df.columns and not pd.api.types.is_numeric_dtype(df[col]):
+            df[col] = pd.to_numeric(df[col], errors='coerce')
+    
+    return df
+
 def filter_products(df: pd.DataFrame, filters: Dict[str, Any]) -> pd.DataFrame:
     """
     Filter products based on specified criteria
@@ -27,44 +66,34 @@ def filter_products(df: pd.DataFrame, filters: Dict[str, Any]) -> pd.DataFrame:
       - price_min: float - minimum price
       - price_max: float - maximum price
       - min_rating: float - minimum rating score
+      - expression: dict - boolean filter expression (and/or/not, eq, in,
+        numeric ranges, contains), ANDed with the keys above; see
+        inventory.expressions.parse_expression
+      An Expr from inventory.expressions is accepted in place of the dictionary.
     
     Returns:
     - Filtered DataFrame
     """
-    filtered_df = df.copy()
-    
-    # Filter by category
-    if 'category' in filters and filters['category']:
-        categories = filters['category'] if isinstance(filters['category'], list) else [filters['category']]
-        filtered_df = filtered_df[filtered_df['category'].str.lower().isin([c.lower() for c in categories])]
-    
-    # Filter by color
-    if 'color' in filters and filters['color']:
-        colors = filters['color'] if isinstance(filters['color'], list) else [filters['color']]
-        filtered_df = filtered_df[filtered_df['color'].str.lower().isin([c.lower() for c in colors])]
+    plan = plan_filters(df, filters)
+    if plan is None:
+        return df.copy()
     
-    # Filter by price range
-    if 'price_min' in filters and filters['price_min'] is not None:
-        filtered_df = filtered_df[filtered_df['price'] >= filters['price_min']]
-    
-    if 'price_max' in filters and filters['price_max'] is not None:
-        filtered_df = filtered_df[filtered_df['price'] <= filters['price_max']]
-    
-    # Filter by minimum rating
-    if 'min_rating' in filters and filters['min_rating'] is not None:
-        filtered_df = filtered_df[filtered_df['rating'] >= filters['min_rating']]
-    
-    return filtered_df
+    return df[plan.evaluate()]
 
-def get_recommendation_reasons(product: Dict, filters: Dict[str, Any]) -> str:
+def get_recommendation_reasons(product: Dict, filters: Dict[str, Any], well_under_budget: Optional[bool] = None) -> str:
     """
     Generate recommendation explanations based on filters and product attributes
+    
+    `well_under_budget` may be supplied by the price/rating index, which knows
+    it from the product's position in price order; otherwise it is computed.
     """
     reasons = []
     
     # Price-based reasons
     if 'price_max' in filters and filters['price_max']:
-        if product['price'] <= filters['price_max'] * 0.8:
+        if well_under_budget is None:
+            well_under_budget = product['price'] <= filters['price_max'] * WELL_UNDER_BUDGET_RATIO
+        if well_under_budget:
             reasons.append("well under your budget")
         elif product['price'] <= filters['price_max']:
             reasons.append("fits your budget")
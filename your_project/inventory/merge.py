@@ -0,0 +1,245 @@
+import os
+import shutil
+import logging
+import argparse
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Dict, List, Any, Optional, Sequence, Tuple
+
+import pandas as pd
+
+from inventory.excel import iter_excel_chunks
+from inventory.filters import validate_inventory
+
+# Set up logging
+logger = logging.getLogger(__name__)
+
+DEFAULT_KEY_COLUMNS = ('name', 'category', 'color')
+
+# Bookkeeping columns carried through the partition files
+FEED_COLUMN = '_feed'
+SEQ_COLUMN = '_seq'
+
+
+def _normalized_keys(df: pd.DataFrame, key_columns: Sequence[str]) -> pd.DataFrame:
+    """
+    Case- and whitespace-insensitive view of the dedup key columns
+
+    Raises ValueError if a key column is missing, rather than treating it as empty.
+    """
+    missing = [col for col in key_columns if col not in df.columns]
+    if missing:
+        raise ValueError(f"Feed is missing key columns: {', '.join(missing)}")
+    return pd.DataFrame({
+        col: df[col].astype(str).str.strip().str.lower()
+        for col in key_columns
+    }, index=df.index)
+
+
+# Feed formats that can be read in chunks without loading the whole file
+STREAMABLE_FEED_FORMATS = ('.csv', '.xlsx')
+
+
+def _check_feed_format(path: str) -> None:
+    _, ext = os.path.splitext(str(path))
+    if ext.lower() == '.xls':
+        raise ValueError(f"Legacy .xls feeds cannot be streamed; convert {path} to .csv or .xlsx first")
+    if ext.lower() not in STREAMABLE_FEED_FORMATS:
+        raise ValueError(f"Unsupported feed format: {ext}")
+
+
+def _iter_chunks(path: str, chunksize: int):
+    _check_feed_format(path)
+    _, ext = os.path.splitext(path)
+    if ext.lower() == '.csv':
+        chunks = pd.read_csv(path, chunksize=chunksize)
+    else:
+        chunks = iter_excel_chunks(path, chunk_rows=chunksize)
+    # Every feed gets the same column/blank-row normalization load_inventory applies
+    for chunk in chunks:
+        yield validate_inventory(chunk)
+
+
+def _partition_feed(
+    feed_index: int,
+    path: str,
+    work_dir: str,
+    key_columns: Sequence[str],
+    partitions: int,
+    chunksize: int,
+) -> Tuple[int, List[str]]:
+    """
+    Stream one feed and append each row to the partition file its key hashes to
+
+    Chunks (e.g. from different sheets) may order their columns differently or
+    add new ones, so every chunk is written in the feed's running column order.
+    When a chunk adds columns, later rows go to new part files with their own
+    header, and all part files are read back by column name.
+    """
+    rows = 0
+    columns: List[str] = []
+    segment = -1
+    for chunk in _iter_chunks(path, chunksize):
+        new_columns = [col for col in chunk.columns if col not in columns]
+        if new_columns or segment < 0:
+            columns.extend(new_columns)
+            segment += 1
+
+        chunk = chunk.reindex(columns=columns)
+        chunk[FEED_COLUMN] = feed_index
+        chunk[SEQ_COLUMN] = range(rows, rows + len(chunk))
+        rows += len(chunk)
+
+        hashes = pd.util.hash_pandas_object(_normalized_keys(chunk, key_columns), index=False)
+        buckets = (hashes.to_numpy() % partitions).astype('int64')
+
+        for bucket, part in chunk.groupby(buckets, sort=False):
+            part_path = os.path.join(work_dir, f"part-{bucket:05d}-feed-{feed_index:05d}-{segment:05d}.csv")
+            part.to_csv(part_path, mode='a', index=False, header=not os.path.exists(part_path))
+
+    return rows, columns
+
+
+def merge_feeds(
+    feeds: Sequence[str],
+    output_path: str,
+    key_columns: Sequence[str] = DEFAULT_KEY_COLUMNS,
+    precedence: Optional[Sequence[Tuple[str, str]]] = None,
+    partitions: int = 64,
+    chunksize: int = 100_000,
+    workers: int = 4,
+    work_dir: Optional[str] = None,
+) -> Dict[str, Any]:
+    """
+    Merge several product feeds into one deduplicated catalog with bounded memory
+
+    Each feed is streamed in chunks and every row is routed to one of
+    `partitions` spill files by a hash of its dedup key, so rows that can
+    conflict always land in the same partition. Partitions are then resolved
+    one at a time and appended to the output, so peak memory is roughly one
+    chunk while reading and one partition while merging.
+
+    Parameters:
+    - feeds: CSV or .xlsx feed files, highest precedence first (legacy .xls must be converted first)
+    - output_path: Destination CSV for the unified catalog
+    - key_columns: Columns identifying the same product across feeds (values compared case-insensitively)
+    - precedence: Extra (column, 'asc'|'desc') rules deciding which conflicting row wins,
+      applied before feed order, e.g. [('updated_at', 'desc')]
+    - partitions: Number of hash partitions; raise it when a partition would not fit in memory
+    - chunksize: Rows read per chunk
+    - workers: Feeds read in parallel worker processes
+    - work_dir: Directory for spill files (a temporary directory by default)
+
+    Returns:
+    - Dictionary with input, output and duplicate row counts
+
+    Raises ValueError if a feed lacks a required inventory column or a key column.
+    """
+    _, ext = os.path.splitext(output_path)
+    if ext.lower() != '.csv':
+        raise ValueError(f"Unsupported output format: {ext}")
+
+    for feed in feeds:
+        _check_feed_format(feed)
+
+    # Feed headers are lower-cased by validate_inventory, so column names given here are too
+    key_columns = [c.strip().lower() for c in key_columns]
+    precedence = [(c.strip().lower(), d) for c, d in precedence or []]
+    for column, direction in precedence:
+        if direction not in ('asc', 'desc'):
+            raise ValueError(f"Invalid precedence direction for {column}: {direction}")
+
+    own_work_dir = work_dir is None
+    work_dir = tempfile.mkdtemp(prefix="catalog-merge-") if own_work_dir else work_dir
+    os.makedirs(work_dir, exist_ok=True)
+
+    try:
+        # Pass 1: stream every feed into hash partitions, feeds in parallel
+        args = [(i, str(path), work_dir, list(key_columns), partitions, chunksize) for i, path in enumerate(feeds)]
+        if workers > 1 and len(feeds) > 1:
+            with ProcessPoolExecutor(max_workers=min(workers, len(feeds))) as pool:
+                results = list(pool.map(_partition_feed, *zip(*args)))
+        else:
+            results = [_partition_feed(*a) for a in args]
+
+        rows_in = sum(rows for rows, _ in results)
+        columns: List[str] = []
+        for _, feed_columns in results:
+            columns.extend(c for c in feed_columns if c not in columns)
+        logger.info(f"Partitioned {rows_in} rows from {len(feeds)} feeds into {partitions} partitions")
+
+        sort_columns = [c for c, _ in precedence] + [FEED_COLUMN, SEQ_COLUMN]
+        ascending = [d == 'asc' for _, d in precedence] + [True, True]
+
+        # Pass 2: resolve conflicts one partition at a time and append to the output
+        rows_out = 0
+        header = True
+        tmp_output = f"{output_path}.tmp"
+        for bucket in range(partitions):
+            part_files = sorted(Path(work_dir).glob(f"part-{bucket:05d}-feed-*.csv"))
+            if not part_files:
+                continue
+
+            part = pd.concat([pd.read_csv(f) for f in part_files], ignore_index=True)
+            for column in sort_columns:
+                if column not in part.columns:
+                    part[column] = None
+            part = part.sort_values(sort_columns, ascending=ascending, kind='mergesort', na_position='last')
+            keep = ~_normalized_keys(part, key_columns).duplicated(keep='first')
+            part = part[keep].sort_values([FEED_COLUMN, SEQ_COLUMN])
+
+            part.reindex(columns=columns).to_csv(tmp_output, mode='w' if header else 'a', index=False, header=header)
+            header = False
+            rows_out += len(part)
+
+        if header:
+            # No rows at all: still produce a catalog with the known columns
+            pd.DataFrame(columns=columns).to_csv(tmp_output, index=False)
+        os.replace(tmp_output, output_path)
+
+    finally:
+        if own_work_dir:
+            shutil.rmtree(work_dir, ignore_errors=True)
+
+    stats = {"feeds": len(feeds), "rows_in": rows_in, "rows_out": rows_out, "duplicates": rows_in - rows_out}
+    logger.info(f"Merged catalog written to {output_path}: {stats}")
+    return stats
+
+
+def _parse_precedence(rules: List[str]) -> List[Tuple[str, str]]:
+    parsed = []
+    for rule in rules:
+        column, _, direction = rule.partition(':')
+        parsed.append((column, direction or 'asc'))
+    return parsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Merge product feeds into one deduplicated catalog")
+    parser.add_argument("feeds", nargs="+", help="Feed files, highest precedence first")
+    parser.add_argument("-o", "--output", required=True, help="Output CSV path")
+    parser.add_argument("--key", default=",".join(DEFAULT_KEY_COLUMNS), help="Comma-separated dedup key columns")
+    parser.add_argument("--prefer", action="append", default=[],
+                        help="Precedence rule column[:asc|desc], applied before feed order (repeatable)")
+    parser.add_argument("--partitions", type=int, default=64)
+    parser.add_argument("--chunksize", type=int, default=100_000)
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--work-dir", default=None)
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    stats = merge_feeds(
+        args.feeds, args.output,
+        key_columns=[c.strip() for c in args.key.split(",") if c.strip()],
+        precedence=_parse_precedence(args.prefer),
+        partitions=args.partitions,
+        chunksize=args.chunksize,
+        workers=args.workers,
+        work_dir=args.work_dir,
+    )
+    print(stats)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,542 @@
+import os
+import re
+import json
+import zlib
+import logging
+import argparse
+from typing import Dict, List, Any, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+# Set up logging
+logger = logging.getLogger(__name__)
+
+DEFAULT_STORE_DIR = ".cache/similar"
+DEFAULT_K = 10
+
+# Products are only compared within their own category; these weight the rest
+DEFAULT_WEIGHTS = {"color": 1.0, "price": 1.5, "rating": 0.5, "name": 2.0}
+
+# Log-price distance at which price similarity drops to 1/e (about 1.65x apart)
+PRICE_SCALE = 0.5
+
+TOKEN_PATTERN = re.compile(r"[a-z0-9]+")
+
+# Score cells computed at once (rows in a chunk x products in the category)
+CHUNK_CELLS = 2 ** 22
+
+STORE_ARRAYS = ("indptr", "indices", "scores", "keys", "fingerprints")
+
+
+def _text(value: Any) -> str:
+    if value is None or (isinstance(value, float) and np.isnan(value)):
+        return ""
+    return str(value).strip().lower()
+
+
+def product_key(name: Any, category: Any, color: Any) -> str:
+    """
+    Stable identity of a product across catalog versions (the merge dedup key)
+    """
+    return f"{_text(name)}|{_text(category)}|{_text(color)}"
+
+
+def _column(df: pd.DataFrame, name: str) -> pd.Series:
+    if name in df.columns:
+        return df[name]
+    return pd.Series([None] * len(df), index=df.index, dtype=object)
+
+
+def _gather_ranges(data: np.ndarray, starts: np.ndarray, lengths: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Concatenate data[starts[i]:starts[i] + lengths[i]] for all i
+
+    Returns:
+    - The concatenated values and, for each value, the i it came from
+    """
+    lengths = np.asarray(lengths, dtype=np.int64)
+    total = int(lengths.sum())
+    owner = np.repeat(np.arange(len(lengths)), lengths)
+    offsets = np.arange(total) - np.repeat(np.cumsum(lengths) - lengths, lengths)
+    offsets += np.repeat(np.asarray(starts, dtype=np.int64), lengths)
+    return data[offsets], owner
+
+
+def _catalog_columns(df: pd.DataFrame) -> Tuple[List[str], List[str], List[str], np.ndarray, np.ndarray]:
+    """
+    Normalized names, categories and colors, and numeric prices and ratings
+    """
+    names = [_text(v) for v in _column(df, "name")]
+    categories = [_text(v) for v in _column(df, "category")]
+    colors = [_text(v) for v in _column(df, "color")]
+    prices = pd.to_numeric(_column(df, "price"), errors="coerce").to_numpy(dtype=float)
+    ratings = pd.to_numeric(_column(df, "rating"), errors="coerce").to_numpy(dtype=float)
+    return names, categories, colors, prices, ratings
+
+
+def _catalog_keys(names, categories, colors, prices, ratings) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Product keys and per-product content fingerprints, in row order
+    """
+    # Repeated keys get an occurrence suffix so every row stays addressable
+    keys, seen = [], {}
+    for name, category, color in zip(names, categories, colors):
+        key = f"{name}|{category}|{color}"
+        count = seen.get(key, 0)
+        seen[key] = count + 1
+        keys.append(key if count == 0 else f"{key}#{count + 1}")
+    fingerprints = np.array(
+        [zlib.crc32(f"{key}|{price:.4f}|{rating:.2f}".encode("utf-8"))
+         for key, price, rating in zip(keys, prices, ratings)],
+        dtype=np.uint32,
+    )
+    return np.array(keys, dtype=str), fingerprints
+
+
+def _fingerprint(fingerprints: np.ndarray) -> str:
+    return f"{len(fingerprints)}-{zlib.crc32(fingerprints.tobytes()):08x}"
+
+
+def catalog_fingerprint(df: pd.DataFrame) -> str:
+    """
+    Identity of an inventory's similarity-relevant content (names, categories, colors, prices, ratings)
+    """
+    return _fingerprint(_catalog_keys(*_catalog_columns(df))[1])
+
+
+def store_path(fingerprint: str, store_dir: Optional[str] = None) -> str:
+    """
+    Directory holding the neighbour lists of the catalog with this fingerprint
+    """
+    return os.path.join(store_dir or os.getenv("SIMILAR_ITEMS_DIR", DEFAULT_STORE_DIR), fingerprint)
+
+
+class _Features:
+    """
+    Per-product similarity features of an inventory, in row order
+    """
+
+    def __init__(self, df: pd.DataFrame):
+        names, categories, colors, prices, ratings = _catalog_columns(df)
+        self.keys, self.fingerprints = _catalog_keys(names, categories, colors, prices, ratings)
+
+        self.category = pd.factorize(pd.Series(categories, dtype=object))[0]
+        self.color = pd.factorize(pd.Series([c or None for c in colors], dtype=object))[0]
+        self.log_price = np.log(np.clip(prices, 0.01, None))
+        self.rating = ratings
+
+        tokens = [sorted(set(TOKEN_PATTERN.findall(name))) for name in names]
+        self.token_count = np.array([len(t) for t in tokens], dtype=np.int64)
+        self.token_indptr = np.concatenate([[0], np.cumsum(self.token_count)])
+        flat = [token for product_tokens in tokens for token in product_tokens]
+        self.token_ids = pd.factorize(pd.Series(flat, dtype=object))[0] if flat else np.zeros(0, dtype=np.int64)
+
+        # Members of each category in product key order, which breaks score ties:
+        # unlike row positions, keys survive catalog edits, so a kept list
+        # stays what a full rebuild would choose
+        key_rank = np.argsort(np.argsort(self.keys, kind="stable"), kind="stable")
+        order = np.lexsort((key_rank, self.category))
+        bounds = np.flatnonzero(np.diff(self.category[order])) + 1
+        self.members = {int(self.category[group[0]]): group for group in np.split(order, bounds) if len(group)}
+        # Position of every product within its category's members
+        self.local = np.empty(len(self.keys), dtype=np.int64)
+        for group in self.members.values():
+            self.local[group] = np.arange(len(group))
+        self._blocks: Dict[int, "_Block"] = {}
+
+    def __len__(self) -> int:
+        return len(self.keys)
+
+    def catalog_fingerprint(self) -> str:
+        return _fingerprint(self.fingerprints)
+
+    def block(self, category: int) -> "_Block":
+        if category not in self._blocks:
+            self._blocks[category] = _Block(self, self.members[category])
+        return self._blocks[category]
+
+
+class _Block:
+    """
+    Products of one category with an inverted index over their name tokens
+    """
+
+    def __init__(self, features: _Features, members: np.ndarray):
+        self.features = features
+        self.members = members
+        self.color = features.color[members]
+        # Missing values sit at opposite extremes on the row and column side,
+        # so any comparison involving one contributes nothing
+        log_price = features.log_price[members].astype(np.float32)
+        rating = features.rating[members].astype(np.float32)
+        self.row_log_price = np.where(np.isnan(log_price), 1e6, log_price).astype(np.float32)
+        self.col_log_price = np.where(np.isnan(log_price), -1e6, log_price).astype(np.float32)
+        self.row_rating = np.where(np.isnan(rating), 1e3, rating).astype(np.float32)
+        self.col_rating = np.where(np.isnan(rating), -1e3, rating).astype(np.float32)
+        self.token_count = features.token_count[members]
+
+        starts = features.token_indptr[members]
+        tokens, owner = _gather_ranges(features.token_ids, starts, self.token_count)
+        order = np.argsort(tokens, kind="stable")
+        self.posting_tokens = tokens[order]
+        self.posting_members = owner[order]
+
+    def scores(self, local: np.ndarray, weights: Dict[str, float]) -> np.ndarray:
+        """
+        Similarity of block members `local` to every member (self excluded as -inf)
+        """
+        m = len(self.members)
+        scores = np.zeros((len(local), m), dtype=np.float32)
+
+        if weights.get("color"):
+            same = (self.color[local, None] == self.color[None, :]) & (self.color[local, None] >= 0)
+            np.add(scores, np.float32(weights["color"]), out=scores, where=same)
+
+        if weights.get("price"):
+            term = np.subtract(self.row_log_price[local, None], self.col_log_price[None, :])
+            np.abs(term, out=term)
+            term *= np.float32(-1.0 / PRICE_SCALE)
+            np.exp(term, out=term)
+            term *= np.float32(weights["price"])
+            scores += term
+
+        if weights.get("rating"):
+            term = np.subtract(self.row_rating[local, None], self.col_rating[None, :])
+            np.abs(term, out=term)
+            term *= np.float32(-0.25)
+            term += np.float32(1.0)
+            np.maximum(term, 0.0, out=term)
+            term *= np.float32(weights["rating"])
+            scores += term
+
+        if weights.get("name"):
+            # Shared-token counts via the inverted index, then Jaccard
+            starts = self.features.token_indptr[self.members[local]]
+            tokens, owner = _gather_ranges(self.features.token_ids, starts, self.token_count[local])
+            lo = np.searchsorted(self.posting_tokens, tokens, side="left")
+            hi = np.searchsorted(self.posting_tokens, tokens, side="right")
+            hits, which = _gather_ranges(self.posting_members, lo, hi - lo)
+            shared = np.bincount(owner[which] * m + hits, minlength=len(local) * m)
+            shared = shared.astype(np.float32).reshape(len(local), m)
+            union = np.add(self.token_count[local, None], self.token_count[None, :], dtype=np.float32)
+            union -= shared
+            np.maximum(union, 1.0, out=union)
+            shared /= union
+            shared *= np.float32(weights["name"])
+            scores += shared
+
+        scores[np.arange(len(local)), local] = -np.inf
+        return scores
+
+
+def _top_k(scores: np.ndarray, members: np.ndarray, k: int) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Best k columns per row; ties go to the lowest column (members are in
+    product key order) so the result does not depend on which rows were
+    computed together or on row positions
+    """
+    kk = min(k, scores.shape[1] - 1)
+    if kk <= 0:
+        return np.zeros((len(scores), 0), dtype=np.int32), np.zeros((len(scores), 0), dtype=np.float32)
+    cutoff = -np.partition(-scores, kk - 1, axis=1)[:, kk - 1:kk]
+    above = scores > cutoff
+    tied = scores == cutoff
+    tied &= np.cumsum(tied, axis=1) <= kk - above.sum(axis=1, keepdims=True)
+    above |= tied
+    cols = np.nonzero(above)[1].reshape(len(scores), kk)
+    values = np.take_along_axis(scores, cols, axis=1)
+    order = np.lexsort((cols, -values), axis=-1)
+    cols = np.take_along_axis(cols, order, axis=1)
+    return members[cols], np.take_along_axis(values, order, axis=1)
+
+
+def _compute_rows(features: _Features, rows: np.ndarray, k: int, weights: Dict[str, float], on_scores=None):
+    """
+    Top-k neighbours of the given products, padded with -1
+
+    Parameters:
+    - on_scores: Optional callback receiving (block, local rows, score matrix)
+      for every chunk, used by the incremental update
+
+    Returns:
+    - (len(rows), k) arrays of neighbour ids and scores, best first
+    """
+    ids = np.full((len(rows), k), -1, dtype=np.int32)
+    values = np.full((len(rows), k), -np.inf, dtype=np.float32)
+
+    categories = features.category[rows]
+    order = np.argsort(categories, kind="stable")
+    bounds = np.flatnonzero(np.diff(categories[order])) + 1
+    for group in np.split(order, bounds):
+        if not len(group):
+            continue
+        block = features.block(int(categories[group[0]]))
+        local = features.local[rows[group]]
+        chunk = max(1, CHUNK_CELLS // len(block.members))
+        for start in range(0, len(group), chunk):
+            part = local[start:start + chunk]
+            scores = block.scores(part, weights)
+            if on_scores is not None:
+                on_scores(block, part, scores)
+            top_ids, top_values = _top_k(scores, block.members, k)
+            slots = group[start:start + chunk]
+            ids[slots, :top_ids.shape[1]] = top_ids
+            values[slots, :top_values.shape[1]] = top_values
+
+    return ids, values
+
+
+class SimilarItems:
+    """
+    Precomputed top-K "similar items" per product, stored CSR-style.
+
+    Neighbours of product i are indices[indptr[i]:indptr[i + 1]], best
+    first (equal scores in product key order), with product ids being row
+    positions in the inventory the lists were built for. Arrays are int32 .npy files loaded memory-mapped, so a
+    lookup is two array reads regardless of catalog size.
+    """
+
+    def __init__(self, arrays: Dict[str, np.ndarray], meta: Dict[str, Any]):
+        self.indptr = arrays["indptr"]
+        self.indices = arrays["indices"]
+        self.scores = arrays["scores"]
+        self.keys = arrays["keys"]
+        self.fingerprints = arrays["fingerprints"]
+        self.meta = meta
+        self._key_index: Optional[Dict[str, int]] = None
+        if len(self.indptr) != len(self.keys) + 1:
+            raise ValueError("Inconsistent similar-items store")
+
+    @classmethod
+    def load(cls, store_dir: str) -> "SimilarItems":
+        with open(os.path.join(store_dir, "meta.json"), encoding="utf-8") as f:
+            meta = json.load(f)
+        arrays = {name: np.load(os.path.join(store_dir, f"{name}.npy"), mmap_mode="r") for name in STORE_ARRAYS}
+        return cls(arrays, meta)
+
+    def save(self, store_dir: str) -> None:
+        os.makedirs(store_dir, exist_ok=True)
+        for name in STORE_ARRAYS:
+            path = os.path.join(store_dir, f"{name}.npy")
+            tmp_path = f"{path}.{os.getpid()}.tmp"
+            with open(tmp_path, "wb") as f:
+                np.save(f, np.asarray(getattr(self, name)))
+            os.replace(tmp_path, path)
+        # Written last: a store is only used once its meta matches the catalog
+        path = os.path.join(store_dir, "meta.json")
+        with open(f"{path}.{os.getpid()}.tmp", "w", encoding="utf-8") as f:
+            json.dump(self.meta, f)
+        os.replace(f"{path}.{os.getpid()}.tmp", path)
+
+    def __len__(self) -> int:
+        return len(self.keys)
+
+    def similar_products(self, product_id: int, k: Optional[int] = None) -> np.ndarray:
+        """
+        Ids of the products most similar to `product_id`, best first
+        """
+        start = int(self.indptr[product_id])
+        end = int(self.indptr[product_id + 1])
+        if k is not None:
+            end = min(end, start + k)
+        return np.asarray(self.indices[start:end])
+
+    def product_id(self, name: Any, category: Any, color: Any) -> Optional[int]:
+        """
+        Id of a product by name, category and color (first occurrence)
+        """
+        if self._key_index is None:
+            self._key_index = {str(key): i for i, key in enumerate(self.keys)}
+        return self._key_index.get(product_key(name, category, color))
+
+
+def _pack(features: _Features, ids: np.ndarray, values: np.ndarray, k: int, weights: Dict[str, float]) -> SimilarItems:
+    valid = ids >= 0
+    indptr = np.concatenate([[0], np.cumsum(valid.sum(axis=1))])
+    if indptr[-1] >= 2 ** 31:
+        raise ValueError("Too many neighbours for int32 offsets; lower k")
+    arrays = {
+        "indptr": indptr.astype(np.int32),
+        "indices": ids[valid].astype(np.int32),
+        "scores": values[valid].astype(np.float32),
+        "keys": features.keys,
+        "fingerprints": features.fingerprints,
+    }
+    meta = {"k": k, "weights": weights, "catalog": features.catalog_fingerprint()}
+    return SimilarItems(arrays, meta)
+
+
+def build_similar_items(df: pd.DataFrame, k: int = DEFAULT_K, weights: Optional[Dict[str, float]] = None) -> SimilarItems:
+    """
+    Compute the neighbour lists for every product in an inventory
+
+    Parameters:
+    - df: Inventory DataFrame
+    - k: Neighbours kept per product
+    - weights: Score weights for color, price, rating and name similarity
+
+    Returns:
+    - SimilarItems held in memory (call save() to persist)
+    """
+    weights = dict(weights or DEFAULT_WEIGHTS)
+    features = _Features(df)
+    ids, values = _compute_rows(features, np.arange(len(features)), k, weights)
+    return _pack(features, ids, values, k, weights)
+
+
+def _latest_store(store_dir: str, k: int, weights: Dict[str, float]) -> Optional[SimilarItems]:
+    """
+    Most recently written store under store_dir built with the same k and weights
+    """
+    candidates = []
+    for entry in os.scandir(store_dir) if os.path.isdir(store_dir) else []:
+        meta_path = os.path.join(entry.path, "meta.json")
+        if entry.is_dir() and os.path.exists(meta_path):
+            candidates.append((os.path.getmtime(meta_path), entry.path))
+
+    for _, path in sorted(candidates, reverse=True):
+        try:
+            store = SimilarItems.load(path)
+        except Exception as e:
+            logger.warning(f"Skipping unreadable similar-items store {path}: {e}")
+            continue
+        if store.meta.get("k") == k and store.meta.get("weights") == weights:
+            return store
+    return None
+
+
+def update_similar_items(
+    df: pd.DataFrame,
+    store_dir: Optional[str] = None,
+    k: int = DEFAULT_K,
+    weights: Optional[Dict[str, float]] = None,
+) -> Tuple[SimilarItems, int]:
+    """
+    Build the neighbour lists for a catalog, reusing the most recent earlier build
+
+    Lists are saved under store_dir/<catalog fingerprint>, so catalogs never
+    overwrite each other's store. If that store already exists it is simply
+    loaded. Otherwise only products touched by the change since the most
+    recent compatible store are recomputed: new or modified products,
+    products whose list mentions a removed or modified product, and products
+    a modified product now scores at least as high as their current K-th
+    neighbour. Everything else keeps its list, remapped to the new row
+    positions. Without a compatible store this is a full build.
+
+    Returns:
+    - The saved SimilarItems (memory-mapped) and the number of products recomputed
+    """
+    store_dir = store_dir or os.getenv("SIMILAR_ITEMS_DIR", DEFAULT_STORE_DIR)
+    weights = dict(weights or DEFAULT_WEIGHTS)
+    features = _Features(df)
+    n = len(features)
+    target = store_path(features.catalog_fingerprint(), store_dir)
+
+    if os.path.exists(os.path.join(target, "meta.json")):
+        try:
+            current = SimilarItems.load(target)
+            if current.meta.get("k") == k and current.meta.get("weights") == weights:
+                logger.info(f"Similar items for this catalog are already in {target}")
+                return current, 0
+        except Exception as e:
+            logger.warning(f"Rebuilding unreadable similar-items store {target}: {e}")
+
+    old = _latest_store(store_dir, k, weights)
+
+    if old is None:
+        ids, values = _compute_rows(features, np.arange(n), k, weights)
+        recomputed = n
+    else:
+        old_index = {str(key): i for i, key in enumerate(old.keys)}
+        new_to_old = np.array([old_index.get(key, -1) for key in features.keys], dtype=np.int64)
+        old_fingerprints = np.asarray(old.fingerprints)
+        changed = (new_to_old < 0) | (old_fingerprints[np.maximum(new_to_old, 0)] != features.fingerprints)
+
+        old_to_new = np.full(len(old), -1, dtype=np.int64)
+        old_to_new[new_to_old[~changed]] = np.flatnonzero(~changed)
+
+        old_indptr = np.asarray(old.indptr, dtype=np.int64)
+        old_indices = np.asarray(old.indices)
+        old_scores = np.asarray(old.scores)
+        old_counts = np.diff(old_indptr)
+
+        # Lists that mention a removed or modified product
+        entry_rows = np.repeat(np.arange(len(old)), old_counts)
+        stale_rows = old_to_new[np.unique(entry_rows[old_to_new[old_indices] < 0])]
+        recompute = changed.copy()
+        recompute[stale_rows[stale_rows >= 0]] = True
+
+        # The K-th best score of every kept list; anything scoring at least this enters it
+        kth = np.full(n, -np.inf, dtype=np.float32)
+        unchanged = np.flatnonzero(~changed)
+        full = old_counts[new_to_old[unchanged]] >= k
+        kth[unchanged[full]] = old_scores[old_indptr[new_to_old[unchanged[full]] + 1] - 1]
+        gains = np.zeros(n, dtype=bool)
+
+        def check_gains(block, local, scores):
+            # Scores are symmetric, so a touched product's row doubles as its column
+            gains[block.members] |= scores.max(axis=0) >= kth[block.members]
+
+        touched = np.flatnonzero(changed)
+        ids = np.full((n, k), -1, dtype=np.int32)
+        values = np.full((n, k), -np.inf, dtype=np.float32)
+        ids[touched], values[touched] = _compute_rows(features, touched, k, weights, check_gains)
+
+        rest = np.flatnonzero((recompute | gains) & ~changed)
+        ids[rest], values[rest] = _compute_rows(features, rest, k, weights)
+
+        keep = np.flatnonzero(~(recompute | gains))
+        sources = new_to_old[keep]
+        entries, owner = _gather_ranges(np.arange(len(old_indices)), old_indptr[sources], old_counts[sources])
+        slots = entries - np.repeat(old_indptr[sources], old_counts[sources])
+        ids[keep[owner], slots] = old_to_new[old_indices[entries]]
+        values[keep[owner], slots] = old_scores[entries]
+        recomputed = len(touched) + len(rest)
+
+    _pack(features, ids, values, k, weights).save(target)
+    logger.info(f"Similar items: recomputed {recomputed} of {n} products into {target}")
+    return SimilarItems.load(target), recomputed
+
+
+def load_similar_items(df: pd.DataFrame, store_dir: Optional[str] = None) -> Optional[SimilarItems]:
+    """
+    Neighbour lists built for exactly this inventory, or None if there are none yet
+
+    Never builds: run `python -m inventory.similar` (update_similar_items) for that.
+    """
+    path = store_path(catalog_fingerprint(df), store_dir)
+    if not os.path.exists(os.path.join(path, "meta.json")):
+        logger.info(f"No similar items for this catalog in {path}; run python -m inventory.similar to build them")
+        return None
+    try:
+        return SimilarItems.load(path)
+    except Exception as e:
+        logger.warning(f"Similar items unavailable: {e}")
+        return None
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Precompute similar-item neighbour lists for an inventory")
+    parser.add_argument("inventory", help="Inventory file (CSV or Excel)")
+    parser.add_argument("--store", default=os.getenv("SIMILAR_ITEMS_DIR", DEFAULT_STORE_DIR),
+                        help="Root directory; each catalog gets its own subdirectory")
+    parser.add_argument("-k", type=int, default=DEFAULT_K, help="Neighbours per product")
+    parser.add_argument("--full", action="store_true", help="Recompute every product instead of only changed ones")
+    args = parser.parse_args()
+
+    from inventory.filters import load_inventory
+
+    logging.basicConfig(level=logging.INFO)
+    df = load_inventory(args.inventory)
+    target = store_path(catalog_fingerprint(df), args.store)
+    if args.full:
+        build_similar_items(df, args.k).save(target)
+        recomputed = len(df)
+    else:
+        _, recomputed = update_similar_items(df, args.store, args.k)
+    print(f"Recomputed {recomputed} of {len(df)} products into {target}")
+
+
+if __name__ == "__main__":
+    main()
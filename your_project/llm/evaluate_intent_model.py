@@ -0,0 +1,121 @@
+import os
+import json
+import time
+import argparse
+from typing import Dict, List, Any, Sequence, Tuple
+
+import numpy as np
+
+from llm.intent_model import DEFAULT_MODEL_PATH, NUMBER_FIELDS, IntentModel
+from llm.train_intent_model import load_training_pairs
+
+FIELDS = ["category", "color"] + NUMBER_FIELDS + ["expression"]
+
+
+def _normalize_value(field: str, value: Any) -> Any:
+    if field in NUMBER_FIELDS:
+        return float(value)
+    if isinstance(value, list):
+        return sorted(str(v).lower() for v in value)
+    if isinstance(value, dict):
+        return json.dumps(value, sort_keys=True).lower()
+    return str(value).lower()
+
+
+def _normalize(filters: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Every non-empty field, including lists, expressions and unknown keys, in comparable form
+    """
+    return {
+        field: _normalize_value(field, value)
+        for field, value in filters.items()
+        if value is not None and value != "" and value != []
+    }
+
+
+def evaluate(model: IntentModel, pairs: Sequence[Tuple[str, Dict[str, Any]]], threshold: float = 0.9) -> Dict[str, Any]:
+    """
+    Measure the model against labelled pairs
+
+    Exact match compares the whole filter dictionary, so a dropped list or
+    expression counts as a miss.
+
+    Returns:
+    - Per-field and exact-match accuracy, coverage and accuracy above the
+      confidence threshold (the queries that would skip the LLM), and
+      per-query prediction latency in microseconds
+    """
+    field_correct = {field: 0 for field in FIELDS}
+    exact = 0
+    covered = 0
+    covered_exact = 0
+    latencies = []
+
+    for query, gold in pairs:
+        start = time.perf_counter()
+        predicted, confidence = model.predict(query)
+        latencies.append((time.perf_counter() - start) * 1e6)
+
+        gold, predicted = _normalize(gold), _normalize(predicted)
+        for field in FIELDS:
+            field_correct[field] += gold.get(field) == predicted.get(field)
+        match = gold == predicted
+        exact += match
+        if confidence >= threshold:
+            covered += 1
+            covered_exact += match
+
+    n = max(len(pairs), 1)
+    p50, p99 = np.percentile(latencies, [50, 99]) if latencies else (0.0, 0.0)
+    return {
+        "pairs": len(pairs),
+        "threshold": threshold,
+        "field_accuracy": {field: correct / n for field, correct in field_correct.items()},
+        "exact_match": exact / n,
+        "coverage": covered / n,
+        "covered_exact_match": covered_exact / covered if covered else 0.0,
+        "latency_us": {"p50": float(p50), "p99": float(p99)},
+    }
+
+
+def format_evaluation(report: Dict[str, Any]) -> str:
+    """
+    Render an evaluation report as human-readable text
+    """
+    lines = [f"Pairs:              {report['pairs']}"]
+    for field, accuracy in report["field_accuracy"].items():
+        lines.append(f"  {field:<18}{accuracy:.1%}")
+    lines += [
+        f"Exact match:        {report['exact_match']:.1%}",
+        f"Coverage @ {report['threshold']:.2f}:    {report['coverage']:.1%} of queries skip the LLM",
+        f"Exact match there:  {report['covered_exact_match']:.1%}",
+        f"Latency:            p50 {report['latency_us']['p50']:.0f}us  p99 {report['latency_us']['p99']:.0f}us",
+    ]
+    if "load_ms" in report:
+        lines.append(f"Model load:         {report['load_ms']:.1f}ms")
+    return "\n".join(lines)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Evaluate the local intent model's accuracy and latency")
+    parser.add_argument("--model", default=os.getenv("INTENT_MODEL_PATH", DEFAULT_MODEL_PATH))
+    parser.add_argument("--log-dir", default=os.getenv("QUERY_LOG_DIR", "logs/queries"))
+    parser.add_argument("--pairs", default=None, help="JSONL file of {query, filters} pairs to evaluate on")
+    parser.add_argument("--threshold", type=float, default=float(os.getenv("INTENT_MODEL_THRESHOLD", "0.9")))
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    model = IntentModel.load(args.model)
+    load_ms = (time.perf_counter() - start) * 1000
+
+    pairs = load_training_pairs(None if args.pairs else args.log_dir, args.pairs)
+    if not pairs:
+        raise SystemExit("No evaluation pairs found")
+
+    report = evaluate(model, pairs, args.threshold)
+    report["load_ms"] = load_ms
+    print(format_evaluation(report))
+
+
+if __name__ == "__main__":
+    main()
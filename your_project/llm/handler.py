@@ -4,10 +4,19 @@ import requests
 from typing import Dict, Any, Optional
 import logging
 
+from inventory.expressions import parse_expression
+
 # Set up logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+DEFAULT_BASE_URL = "https://openrouter.ai/api/v1"
+
+# (connect, read) seconds for the OpenRouter request. Kept well under the time
+# identical searches wait on a shared parse (search.singleflight.PARSE_TIMEOUT_SECONDS),
+# so a slow call fails for everyone at once instead of each waiter retrying it.
+LLM_TIMEOUT_SECONDS = (5.0, 20.0)
+
 def parse_query(user_query: str) -> Dict[str, Any]:
     """
     Send user query to OpenRouter API and parse the response into structured filters
@@ -37,6 +46,13 @@ def parse_query(user_query: str) -> Dict[str, Any]:
     - price_min: Minimum price (numeric value only)
     - price_max: Maximum price (numeric value only)
     - min_rating: Minimum rating score (if mentioned)
+    - expression: Only when the query needs OR, NOT, several alternatives or a word that must
+      appear in the product name/description. A boolean filter built from:
+        {{"and": [...]}}, {{"or": [...]}}, {{"not": {{...}}}},
+        {{"field": "color", "eq": "red"}}, {{"field": "category", "in": ["dress", "skirt"]}},
+        {{"field": "price", "min": 50, "max": 200}}, {{"contains": "leather"}}
+      Fields are limited to category, color, price and rating; use "contains" for anything
+      else (materials, styles). It is combined with AND with the other fields.
     
     Return ONLY a valid JSON object with these fields. If information for a field is not provided, exclude that field.
     For example:
@@ -45,11 +61,16 @@ def parse_query(user_query: str) -> Dict[str, Any]:
       "color": "red", 
       "price_max": 200
     }}
+    Or, for "leather jackets or coats that are not black":
+    {{
+      "category": ["jacket", "coat"],
+      "expression": {{"and": [{{"contains": "leather"}}, {{"not": {{"field": "color", "eq": "black"}}}}]}}
+    }}
     """
     
     try:
         response = requests.post(
-            "https://openrouter.ai/api/v1/chat/completions",
+            f"{os.getenv('OPENROUTER_BASE_URL', DEFAULT_BASE_URL).rstrip('/')}/chat/completions",
             headers=headers,
             json={
                 "model": "openai/gpt-3.5-turbo",  # Using a simpler model to save costs
@@ -57,8 +78,9 @@ def parse_query(user_query: str) -> Dict[str, Any]:
                     {"role": "system", "content": "You are a helpful assistant that parses product queries into structured data."},
                     {"role": "user", "content": prompt}
                 ],
-                "max_tokens": 150
+                "max_tokens": 250
             },
+            timeout=LLM_TIMEOUT_SECONDS,
         )
         
         response.raise_for_status()
@@ -87,6 +109,14 @@ def parse_query(user_query: str) -> Dict[str, Any]:
         
         if "min_rating" in parsed_filters and parsed_filters["min_rating"] is not None:
             parsed_filters["min_rating"] = float(parsed_filters["min_rating"])
+        
+        # Drop a malformed expression rather than failing the whole query
+        if parsed_filters.get("expression"):
+            try:
+                parse_expression(parsed_filters["expression"])
+            except ValueError as e:
+                logger.warning(f"Ignoring invalid filter expression from LLM: {e}")
+                del parsed_filters["expression"]
             
         return parsed_filters
     
@@ -0,0 +1,345 @@
+import os
+import re
+import zlib
+import logging
+from typing import Dict, List, Any, Optional, Sequence, Tuple
+
+import numpy as np
+
+# Set up logging
+logger = logging.getLogger(__name__)
+
+NONE_LABEL = "<none>"
+NUMBER_FIELDS = ["price_min", "price_max", "min_rating"]
+MODEL_FIELDS = {"category", "color"} | set(NUMBER_FIELDS)
+SHAPE_LABELS = ["simple", "complex"]
+
+# Words signalling alternatives or exclusions, which only the LLM's expressions can represent
+COMPLEX_CUES = {"or", "not", "nor", "either", "neither", "without", "except", "excluding",
+                "isn", "aren", "don", "doesn", "besides"}
+NUMBER_PATTERN = re.compile(r'\$?(\d+(?:\.\d+)?)')
+WORD_PATTERN = re.compile(r"[a-z0-9$]+(?:\.\d+)?")
+
+DEFAULT_MODEL_PATH = "models/intent_model.npz"
+
+
+def _hash(token: str, dim: int) -> int:
+    return zlib.crc32(token.encode("utf-8")) % dim
+
+
+def query_features(query: str, dim: int, ngram_range: Tuple[int, int] = (2, 4)) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Hashed character n-gram and word features of a query, L2-normalized
+
+    Returns:
+    - (feature indices, feature values) as a sparse vector
+    """
+    text = f" {' '.join(query.lower().split())} "
+    counts: Dict[int, float] = {}
+    low, high = ngram_range
+    for n in range(low, high + 1):
+        for i in range(len(text) - n + 1):
+            idx = _hash(f"c{n}:{text[i:i + n]}", dim)
+            counts[idx] = counts.get(idx, 0.0) + 1.0
+    for word in WORD_PATTERN.findall(text):
+        idx = _hash(f"w:{word}", dim)
+        counts[idx] = counts.get(idx, 0.0) + 1.0
+
+    indices = np.fromiter(counts.keys(), dtype=np.int64, count=len(counts))
+    values = np.fromiter(counts.values(), dtype=np.float32, count=len(counts))
+    norm = np.linalg.norm(values)
+    if norm > 0:
+        values /= norm
+    return indices, values
+
+
+def _number_tokens(query: str) -> List[Tuple[int, float, List[str]]]:
+    """
+    Numeric tokens of a query as (token position, value, tokens)
+    """
+    tokens = WORD_PATTERN.findall(query.lower())
+    found = []
+    for i, token in enumerate(tokens):
+        match = NUMBER_PATTERN.fullmatch(token)
+        if match:
+            found.append((i, float(match.group(1)), tokens))
+    return found
+
+
+def number_features(position: int, value: float, tokens: List[str], dim: int) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Context features for tagging one number: nearby words by offset plus magnitude
+    """
+    feats = ["bias", f"mag:{min(int(np.log10(value + 1) * 2), 8)}"]
+    if value <= 5:
+        feats.append("le5")
+    if tokens[position].startswith("$"):
+        feats.append("dollar")
+    for offset in range(-3, 3):
+        j = position + offset
+        if offset != 0 and 0 <= j < len(tokens):
+            feats.append(f"ctx{offset}:{tokens[j]}")
+            feats.append(f"bag:{tokens[j]}")
+    indices = np.array([_hash(f, dim) for f in feats], dtype=np.int64)
+    values = np.full(len(indices), 1.0 / np.sqrt(len(indices)), dtype=np.float32)
+    return indices, values
+
+
+def is_representable(filters: Dict[str, Any]) -> bool:
+    """
+    True if the model can produce these filters: single category/color values
+    and numbers only, no lists, no expression and no other fields
+    """
+    for field, value in filters.items():
+        if value is None or value == "" or value == []:
+            continue
+        if field not in MODEL_FIELDS or isinstance(value, (list, dict)):
+            return False
+    return True
+
+
+def has_complex_cues(query: str) -> bool:
+    """
+    True if the query uses OR/NOT-style wording the model cannot represent
+    """
+    return not COMPLEX_CUES.isdisjoint(WORD_PATTERN.findall(query.lower()))
+
+
+def _softmax(logits: np.ndarray) -> np.ndarray:
+    logits = logits - logits.max(axis=-1, keepdims=True)
+    exp = np.exp(logits)
+    return exp / exp.sum(axis=-1, keepdims=True)
+
+
+def _sparse_logits(W: np.ndarray, b: np.ndarray, indices: np.ndarray, values: np.ndarray) -> np.ndarray:
+    return values @ W[indices] + b
+
+
+def _train_softmax(
+    samples: Sequence[Tuple[np.ndarray, np.ndarray]],
+    labels: np.ndarray,
+    n_classes: int,
+    dim: int,
+    epochs: int,
+    learning_rate: float,
+    l2: float,
+    batch_size: int,
+    seed: int,
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Multinomial logistic regression on sparse inputs with mini-batch Adagrad
+    """
+    rng = np.random.default_rng(seed)
+    W = np.zeros((dim, n_classes), dtype=np.float32)
+    b = np.zeros(n_classes, dtype=np.float32)
+    gW = np.full_like(W, 1e-8)
+    gb = np.full_like(b, 1e-8)
+    order = np.arange(len(samples))
+
+    for _ in range(epochs):
+        rng.shuffle(order)
+        for start in range(0, len(order), batch_size):
+            batch = order[start:start + batch_size]
+            rows = np.concatenate([np.full(len(samples[i][0]), k) for k, i in enumerate(batch)])
+            cols = np.concatenate([samples[i][0] for i in batch])
+            vals = np.concatenate([samples[i][1] for i in batch])
+
+            # Logits for the whole batch via a scatter-add over the sparse entries
+            logits = np.tile(b, (len(batch), 1))
+            np.add.at(logits, rows, vals[:, None] * W[cols])
+            delta = _softmax(logits)
+            delta[np.arange(len(batch)), labels[batch]] -= 1.0
+            delta /= len(batch)
+
+            grad = np.zeros_like(W)
+            np.add.at(grad, cols, vals[:, None] * delta[rows])
+            touched = np.unique(cols)
+            grad[touched] += l2 * W[touched]
+            grad_b = delta.sum(axis=0)
+
+            gW[touched] += grad[touched] ** 2
+            W[touched] -= learning_rate * grad[touched] / np.sqrt(gW[touched])
+            gb += grad_b ** 2
+            b -= learning_rate * grad_b / np.sqrt(gb)
+
+    return W, b
+
+
+class IntentModel:
+    """
+    CPU-only query understanding model distilled from logged LLM parses.
+
+    Category and color come from linear softmax classifiers over hashed
+    character n-grams; each number in the query is tagged as price_min,
+    price_max, min_rating or nothing by a small linear tagger over its
+    context words. Weights are plain NumPy arrays stored in one .npz file.
+
+    The model only produces single-valued fields. A shape classifier trained on
+    the same n-grams recognises queries the LLM answered with lists or boolean
+    expressions; for those, or for queries with OR/NOT wording, the confidence
+    is 0 so they always go to the LLM.
+    """
+
+    def __init__(self, arrays: Dict[str, np.ndarray]):
+        self.dim = int(arrays["dim"])
+        self.number_dim = int(arrays["number_dim"])
+        self.ngram_range = (int(arrays["ngram_range"][0]), int(arrays["ngram_range"][1]))
+        self.category_W = arrays["category_W"]
+        self.category_b = arrays["category_b"]
+        self.category_labels = [str(x) for x in arrays["category_labels"]]
+        self.color_W = arrays["color_W"]
+        self.color_b = arrays["color_b"]
+        self.color_labels = [str(x) for x in arrays["color_labels"]]
+        self.number_W = arrays["number_W"]
+        self.number_b = arrays["number_b"]
+        self.number_labels = [str(x) for x in arrays["number_labels"]]
+        self.shape_W = arrays["shape_W"]
+        self.shape_b = arrays["shape_b"]
+
+    @classmethod
+    def load(cls, path: str) -> "IntentModel":
+        with np.load(path, allow_pickle=False) as data:
+            return cls({key: data[key] for key in data.files})
+
+    def save(self, path: str) -> None:
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        np.savez_compressed(
+            path,
+            dim=np.array(self.dim),
+            number_dim=np.array(self.number_dim),
+            ngram_range=np.array(self.ngram_range),
+            category_W=self.category_W, category_b=self.category_b,
+            category_labels=np.array(self.category_labels),
+            color_W=self.color_W, color_b=self.color_b,
+            color_labels=np.array(self.color_labels),
+            number_W=self.number_W, number_b=self.number_b,
+            number_labels=np.array(self.number_labels),
+            shape_W=self.shape_W, shape_b=self.shape_b,
+        )
+
+    def predict(self, query: str) -> Tuple[Dict[str, Any], float]:
+        """
+        Parse a query into filters
+
+        Returns:
+        - Filter dictionary in the same shape parse_query produces
+        - Confidence: the lowest winning-class probability across all decisions,
+          or 0 when the query needs lists or expressions the model cannot produce
+        """
+        indices, values = query_features(query, self.dim, self.ngram_range)
+        filters: Dict[str, Any] = {}
+
+        shape = _softmax(_sparse_logits(self.shape_W, self.shape_b, indices, values))
+        confidence = float(shape[0])
+
+        for W, b, labels, field in ((self.category_W, self.category_b, self.category_labels, "category"),
+                                    (self.color_W, self.color_b, self.color_labels, "color")):
+            probs = _softmax(_sparse_logits(W, b, indices, values))
+            best = int(probs.argmax())
+            confidence = min(confidence, float(probs[best]))
+            if labels[best] != NONE_LABEL:
+                filters[field] = labels[best]
+
+        for position, value, tokens in _number_tokens(query):
+            idx, vals = number_features(position, value, tokens, self.number_dim)
+            probs = _softmax(_sparse_logits(self.number_W, self.number_b, idx, vals))
+            best = int(probs.argmax())
+            confidence = min(confidence, float(probs[best]))
+            if self.number_labels[best] != NONE_LABEL:
+                filters[self.number_labels[best]] = value
+
+        if has_complex_cues(query) or shape[1] >= shape[0]:
+            confidence = 0.0
+        return filters, confidence
+
+
+def train_intent_model(
+    pairs: Sequence[Tuple[str, Dict[str, Any]]],
+    dim: int = 2 ** 14,
+    number_dim: int = 2 ** 12,
+    ngram_range: Tuple[int, int] = (2, 4),
+    epochs: int = 15,
+    learning_rate: float = 0.5,
+    l2: float = 1e-4,
+    batch_size: int = 64,
+    seed: int = 0,
+) -> IntentModel:
+    """
+    Train the intent model from (query, parsed filters) pairs
+
+    Only pairs the model can represent (see is_representable) train the field
+    classifiers and the number tagger; all pairs train the shape classifier.
+
+    Parameters:
+    - pairs: Logged queries with the filters the LLM (or local parser) produced
+    - dim: Hashed feature space for the category/color/shape classifiers
+    - number_dim: Hashed feature space for the number tagger
+    - ngram_range: Character n-gram lengths
+    - epochs, learning_rate, l2, batch_size, seed: Optimizer settings
+
+    Returns:
+    - Trained IntentModel
+    """
+    if not pairs:
+        raise ValueError("No training pairs")
+
+    all_features = [query_features(q, dim, ngram_range) for q, _ in pairs]
+    arrays: Dict[str, Any] = {"dim": dim, "number_dim": number_dim, "ngram_range": np.array(ngram_range)}
+
+    # Lists and expressions would otherwise be learned as "no category/color"
+    simple = [is_representable(f) for _, f in pairs]
+    shape_y = np.array([0 if ok else 1 for ok in simple], dtype=np.int64)
+    W, b = _train_softmax(all_features, shape_y, len(SHAPE_LABELS), dim, epochs, learning_rate, l2, batch_size, seed)
+    arrays["shape_W"], arrays["shape_b"] = W, b
+
+    features = [feat for feat, ok in zip(all_features, simple) if ok]
+    pairs = [pair for pair, ok in zip(pairs, simple) if ok]
+    if not pairs:
+        raise ValueError("No training pairs the model can represent")
+
+    for field in ("category", "color"):
+        values = [str(f.get(field)).lower() if f.get(field) else NONE_LABEL for _, f in pairs]
+        labels = [NONE_LABEL] + sorted(set(values) - {NONE_LABEL})
+        lookup = {label: i for i, label in enumerate(labels)}
+        y = np.array([lookup[v] for v in values], dtype=np.int64)
+        W, b = _train_softmax(features, y, len(labels), dim, epochs, learning_rate, l2, batch_size, seed)
+        arrays[f"{field}_W"], arrays[f"{field}_b"], arrays[f"{field}_labels"] = W, b, labels
+
+    number_labels = [NONE_LABEL] + NUMBER_FIELDS
+    number_samples, number_y = [], []
+    for query, filters in pairs:
+        for position, value, tokens in _number_tokens(query):
+            label = 0
+            for i, field in enumerate(NUMBER_FIELDS, start=1):
+                if filters.get(field) is not None and abs(float(filters[field]) - value) < 1e-6:
+                    label = i
+                    break
+            number_samples.append(number_features(position, value, tokens, number_dim))
+            number_y.append(label)
+
+    if number_samples:
+        W, b = _train_softmax(number_samples, np.array(number_y, dtype=np.int64), len(number_labels),
+                              number_dim, epochs, learning_rate, l2, batch_size, seed)
+    else:
+        W = np.zeros((number_dim, len(number_labels)), dtype=np.float32)
+        b = np.array([1.0] + [0.0] * len(NUMBER_FIELDS), dtype=np.float32)
+    arrays["number_W"], arrays["number_b"], arrays["number_labels"] = W, b, number_labels
+
+    return IntentModel(arrays)
+
+
+def load_intent_model(path: Optional[str] = None) -> Optional[IntentModel]:
+    """
+    Load the trained model, or None if it has not been trained yet
+    """
+    path = path or os.getenv("INTENT_MODEL_PATH", DEFAULT_MODEL_PATH)
+    if not os.path.exists(path):
+        logger.info(f"No intent model at {path}; all complex queries will use the LLM")
+        return None
+    try:
+        return IntentModel.load(path)
+    except Exception as e:
+        logger.warning(f"Could not load intent model {path}: {e}")
+        return None
@@ -0,0 +1,93 @@
+import os
+import json
+import random
+import logging
+import argparse
+from typing import Dict, List, Any, Optional, Sequence, Tuple
+
+from llm.intent_model import DEFAULT_MODEL_PATH, train_intent_model
+from search.query_log import iter_log_records
+
+# Set up logging
+logger = logging.getLogger(__name__)
+
+# Parses we trust as labels. The keyword parser ("local") stops at its first match
+# ("red dresses under $200" -> category only), and cache/coalesced hits may be the
+# model's own output, so only fresh LLM parses are used.
+TRUSTED_SOURCES = ("llm",)
+
+
+def load_training_pairs(
+    log_dir: Optional[str] = None,
+    pairs_path: Optional[str] = None,
+    sources: Sequence[str] = TRUSTED_SOURCES,
+) -> List[Tuple[str, Dict[str, Any]]]:
+    """
+    Collect (query, filters) pairs from the query log and/or a JSONL file
+
+    Parameters:
+    - log_dir: Query log directory written by search.query_log
+    - pairs_path: JSONL file with {"query": ..., "filters": {...}} per line
+    - sources: Log record sources accepted as labels
+
+    Returns:
+    - List of (query, filters) pairs; records without filters are skipped
+    """
+    pairs = []
+    if log_dir and os.path.isdir(log_dir):
+        for record in iter_log_records(log_dir):
+            if record.get("filters") and record.get("source") in sources:
+                pairs.append((record["query"], record["filters"]))
+
+    if pairs_path:
+        with open(pairs_path, encoding="utf-8") as f:
+            for line in f:
+                if line.strip():
+                    record = json.loads(line)
+                    if record.get("filters"):
+                        pairs.append((record["query"], record["filters"]))
+
+    return pairs
+
+
+def split_pairs(pairs: List[Tuple[str, Dict[str, Any]]], holdout: float, seed: int = 0):
+    """
+    Split pairs by distinct query so held-out queries are never seen in training
+    """
+    queries = sorted({q.strip().lower() for q, _ in pairs})
+    random.Random(seed).shuffle(queries)
+    held = set(queries[:int(len(queries) * holdout)])
+    train = [p for p in pairs if p[0].strip().lower() not in held]
+    test = [p for p in pairs if p[0].strip().lower() in held]
+    return train, test
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Train the local intent model from logged query parses")
+    parser.add_argument("--log-dir", default=os.getenv("QUERY_LOG_DIR", "logs/queries"))
+    parser.add_argument("--pairs", default=None, help="Extra JSONL file of {query, filters} pairs")
+    parser.add_argument("--output", default=os.getenv("INTENT_MODEL_PATH", DEFAULT_MODEL_PATH))
+    parser.add_argument("--holdout", type=float, default=0.1, help="Share of distinct queries held out for evaluation")
+    parser.add_argument("--epochs", type=int, default=15)
+    parser.add_argument("--threshold", type=float, default=0.9)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    pairs = load_training_pairs(args.log_dir, args.pairs)
+    if not pairs:
+        raise SystemExit("No training pairs found")
+
+    train, test = split_pairs(pairs, args.holdout, args.seed)
+    logger.info(f"Training on {len(train)} pairs, holding out {len(test)}")
+    model = train_intent_model(train, epochs=args.epochs, seed=args.seed)
+    model.save(args.output)
+    print(f"Saved intent model to {args.output}")
+
+    if test:
+        from llm.evaluate_intent_model import evaluate, format_evaluation
+        print(format_evaluation(evaluate(model, test, args.threshold)))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1 @@
+# Load testing package 
\ No newline at end of file
@@ -0,0 +1,339 @@
+import os
+import sys
+import time
+import random
+import logging
+import argparse
+import threading
+from pathlib import Path
+from typing import Dict, List, Any, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from inventory.filters import load_inventory
+from inventory.price_rating_index import PriceRatingIndex
+from llm.intent_model import load_intent_model
+from loadtest.stub_llm import StubLLMServer
+from search.cache import parse_cache, filter_cache
+from search.pipeline import run_search
+
+# Set up logging
+logger = logging.getLogger(__name__)
+
+project_root = Path(__file__).parent.parent
+
+# (query, weight) pairs. About half the weight is on queries the local keyword
+# parser cannot handle, so they need the intent model or the LLM; there are many
+# distinct ones because the shared parse cache answers every repeat of a query
+# after its first parse in a run (see cached_requests vs llm_requests in the report).
+DEFAULT_QUERY_MIX: List[Tuple[str, int]] = [
+    # Handled by the local parser
+    ("dresses", 10),
+    ("shoes", 8),
+    ("jeans", 6),
+    ("red", 5),
+    ("under $100", 4),
+    ("Show me red dresses under $200", 10),
+    ("Find blue jackets with good ratings", 5),
+    ("black bag under 150", 4),
+    ("white sneakers over $50", 3),
+    ("best rated coat below $180", 3),
+    # Need the intent model or the LLM
+    ("I need comfortable shoes", 3),
+    ("something warm for winter", 3),
+    ("an outfit for a summer wedding", 3),
+    ("what should I wear to a job interview", 3),
+    ("gift ideas for my mom", 3),
+    ("something cozy to wear at home", 3),
+    ("a classy outfit for date night", 3),
+    ("something to keep my laptop in", 3),
+    ("boots that go with everything", 3),
+    ("stuff for the gym", 3),
+    ("something casual for the weekend", 3),
+    ("elegant evening wear", 3),
+    ("rain-proof outerwear", 3),
+    ("I want to look smart for a conference", 3),
+    ("comfy clothes for travel", 3),
+    ("something for a beach holiday", 3),
+    ("a present for a teenager", 3),
+    ("a warm layer for hiking", 3),
+    ("something for a formal dinner", 3),
+]
+
+STAGES = ["parse", "filter", "cards"]
+
+
+def _state_size(obj: Any, seen: Optional[set] = None) -> int:
+    """
+    Approximate the retained size in bytes of a session state object
+
+    Objects whose id() is already in `seen` (e.g. the shared inventory) are not counted.
+    """
+    if seen is None:
+        seen = set()
+    if id(obj) in seen:
+        return 0
+    seen.add(id(obj))
+
+    if isinstance(obj, pd.DataFrame):
+        return int(obj.memory_usage(deep=True).sum())
+    size = sys.getsizeof(obj)
+    if isinstance(obj, dict):
+        size += sum(_state_size(k, seen) + _state_size(v, seen) for k, v in obj.items())
+    elif isinstance(obj, (list, tuple, set)):
+        size += sum(_state_size(v, seen) for v in obj)
+    return size
+
+
+def _peak_rss_bytes() -> Optional[int]:
+    try:
+        import resource
+    except ImportError:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is reported in bytes on macOS and kilobytes elsewhere
+    return peak if sys.platform == "darwin" else peak * 1024
+
+
+def run_session(
+    session_id: int,
+    inventory_df: pd.DataFrame,
+    queries: List[str],
+    think_time_ms: float,
+    samples: List[Dict[str, Any]],
+    states: List[Dict[str, Any]],
+    lock: threading.Lock,
+    intent_model: Optional[Any] = None,
+    coalesce: bool = True,
+    price_index: Optional[PriceRatingIndex] = None,
+) -> None:
+    """
+    Simulate one shopper: run each query through the app's search pipeline
+    """
+    # Mirror the per-session state that app.py keeps in st.session_state; like the
+    # app, every session holds a reference to the one process-wide inventory
+    state = {
+        "search_history": [],
+        "last_filters": {},
+        "inventory_df": inventory_df,
+        "search_results": None,
+    }
+
+    for query in queries:
+        sample = {"session": session_id, "query": query, "source": "local", "ok": False}
+        start = time.perf_counter()
+        try:
+            result = run_search(query, inventory_df, intent_model=intent_model,
+                                coalesce=coalesce, price_index=price_index)
+            sample["source"] = result["source"]
+            for stage in STAGES:
+                if f"{stage}_ms" in result["timings_ms"]:
+                    sample[stage] = result["timings_ms"][f"{stage}_ms"] / 1000.0
+
+            filters, cards = result["filters"], result["cards"]
+            if filters:
+                state["last_filters"] = filters
+                state["search_results"] = cards
+                state["search_history"].append({
+                    "query": query,
+                    "filters": filters,
+                    "results_count": len(cards)
+                })
+                sample["ok"] = True
+                sample["results"] = len(cards)
+
+        except Exception as e:
+            sample["error"] = str(e)
+
+        sample["total"] = time.perf_counter() - start
+        with lock:
+            samples.append(sample)
+
+        if think_time_ms:
+            time.sleep(think_time_ms / 1000.0)
+
+    with lock:
+        states.append(state)
+
+
+def run_load_test(
+    inventory_df: pd.DataFrame,
+    sessions: int = 10,
+    requests_per_session: int = 20,
+    query_mix: Optional[List[Tuple[str, int]]] = None,
+    think_time_ms: float = 0.0,
+    seed: Optional[int] = None,
+    coalesce: bool = True,
+    intent_model: Optional[Any] = None,
+) -> Dict[str, Any]:
+    """
+    Drive the search pipeline with concurrent simulated sessions
+
+    Runs the same run_search() as the app, including the process-wide parse and
+    filter caches (emptied first so every run starts cold), a price/rating index
+    built once for the shared inventory and, when given, the intent model. Speculative search-as-you-type is not simulated.
+
+    Parameters:
+    - inventory_df: Inventory shared by every session
+    - sessions: Number of concurrent shoppers
+    - requests_per_session: Queries issued by each shopper
+    - query_mix: Weighted (query, weight) pairs to sample from
+    - think_time_ms: Pause between a shopper's queries
+    - seed: Random seed for reproducible query sequences
+    - coalesce: Share identical in-flight parses and filter passes between sessions, as the app does
+    - intent_model: Optional trained IntentModel tried before the LLM
+
+    Returns:
+    - Report dictionary with throughput, latency percentiles and memory figures
+    """
+    mix = query_mix or DEFAULT_QUERY_MIX
+    texts = [q for q, _ in mix]
+    weights = [w for _, w in mix]
+    rng = random.Random(seed)
+
+    parse_cache.clear()
+    filter_cache.clear()
+    price_index = PriceRatingIndex(inventory_df)
+
+    samples: List[Dict[str, Any]] = []
+    states: List[Dict[str, Any]] = []
+    lock = threading.Lock()
+    threads = [
+        threading.Thread(
+            target=run_session,
+            args=(i, inventory_df, rng.choices(texts, weights, k=requests_per_session),
+                  think_time_ms, samples, states, lock, intent_model, coalesce, price_index),
+            daemon=True,
+        )
+        for i in range(sessions)
+    ]
+
+    started = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - started
+
+    return build_report(samples, states, elapsed, shared_inventory=inventory_df)
+
+
+def _percentiles(values: List[float]) -> Dict[str, float]:
+    if not values:
+        return {"p50": 0.0, "p95": 0.0, "p99": 0.0}
+    p50, p95, p99 = np.percentile(np.asarray(values) * 1000.0, [50, 95, 99])
+    return {"p50": float(p50), "p95": float(p95), "p99": float(p99)}
+
+
+def build_report(
+    samples: List[Dict[str, Any]],
+    states: List[Dict[str, Any]],
+    elapsed: float,
+    shared_inventory: Optional[pd.DataFrame] = None,
+) -> Dict[str, Any]:
+    """
+    Summarize raw per-request samples into a capacity report
+
+    The shared inventory is reported once and left out of the per-session figure.
+    """
+    completed = [s for s in samples if s["ok"]]
+    state_sizes = [_state_size(state, {id(shared_inventory)}) for state in states]
+
+    return {
+        "sessions": len(states),
+        "requests": len(samples),
+        "completed": len(completed),
+        "failed": len(samples) - len(completed),
+        "llm_requests": sum(1 for s in samples if s["source"] == "llm"),
+        "coalesced_requests": sum(1 for s in samples if s["source"] == "coalesced"),
+        "cached_requests": sum(1 for s in samples if s["source"] == "cache"),
+        "model_requests": sum(1 for s in samples if s["source"] == "model"),
+        "elapsed_s": elapsed,
+        "throughput_rps": len(completed) / elapsed if elapsed > 0 else 0.0,
+        "latency_ms": _percentiles([s["total"] for s in completed]),
+        "stage_latency_ms": {
+            stage: _percentiles([s[stage] for s in completed if stage in s]) for stage in STAGES
+        },
+        "memory_per_session_bytes": float(np.mean(state_sizes)) if state_sizes else 0.0,
+        "shared_inventory_bytes": _state_size(shared_inventory) if shared_inventory is not None else 0,
+        "peak_rss_bytes": _peak_rss_bytes(),
+    }
+
+
+def format_report(report: Dict[str, Any]) -> str:
+    """
+    Render a report as human-readable text
+    """
+    lat = report["latency_ms"]
+    lines = [
+        f"Sessions:        {report['sessions']}",
+        f"Requests:        {report['requests']} ({report['completed']} ok, {report['failed']} failed, "
+        f"{report['llm_requests']} via LLM, {report.get('model_requests', 0)} via intent model, "
+        f"{report.get('cached_requests', 0)} from parse cache, "
+        f"{report.get('coalesced_requests', 0)} shared an in-flight parse)",
+        f"Elapsed:         {report['elapsed_s']:.2f}s",
+        f"Throughput:      {report['throughput_rps']:.1f} req/s",
+        f"Latency:         p50 {lat['p50']:.1f}ms  p95 {lat['p95']:.1f}ms  p99 {lat['p99']:.1f}ms",
+    ]
+    for stage, stage_lat in report["stage_latency_ms"].items():
+        lines.append(
+            f"  {stage:<14} p50 {stage_lat['p50']:.1f}ms  p95 {stage_lat['p95']:.1f}ms  p99 {stage_lat['p99']:.1f}ms"
+        )
+    lines.append(f"Memory/session:  {report['memory_per_session_bytes'] / 1024:.1f} KiB retained state")
+    lines.append(f"Inventory:       {report.get('shared_inventory_bytes', 0) / 1024:.1f} KiB, shared by all sessions")
+    if report["peak_rss_bytes"]:
+        lines.append(f"Peak RSS:        {report['peak_rss_bytes'] / (1024 * 1024):.1f} MiB")
+    return "\n".join(lines)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Concurrent load test for the search pipeline")
+    parser.add_argument("--inventory", default=str(project_root / "inventory" / "products.csv"),
+                        help="Inventory file to search (any format load_inventory supports)")
+    parser.add_argument("--scale", type=int, default=1,
+                        help="Replicate the inventory this many times to simulate a larger catalog")
+    parser.add_argument("--sessions", type=int, default=10)
+    parser.add_argument("--requests", type=int, default=20, help="Requests per session")
+    parser.add_argument("--think-time-ms", type=float, default=0.0)
+    parser.add_argument("--llm-url", default=None,
+                        help="Use an already running OpenRouter-compatible endpoint instead of the stub")
+    parser.add_argument("--latency-ms", type=float, default=300.0, help="Stub LLM mean latency")
+    parser.add_argument("--jitter-ms", type=float, default=100.0, help="Stub LLM latency jitter")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Stub LLM HTTP 500 probability")
+    parser.add_argument("--seed", type=int, default=None)
+    parser.add_argument("--no-coalesce", action="store_true",
+                        help="Do not share identical in-flight parses between sessions (the app always does)")
+    parser.add_argument("--intent-model", default=None,
+                        help="Intent model file (defaults to INTENT_MODEL_PATH, as in the app)")
+    args = parser.parse_args()
+
+    logging.getLogger().setLevel(logging.WARNING)
+
+    inventory_df = load_inventory(args.inventory)
+    intent_model = load_intent_model(args.intent_model)
+    if args.scale > 1:
+        inventory_df = pd.concat([inventory_df] * args.scale, ignore_index=True)
+
+    stub = None
+    if args.llm_url:
+        os.environ["OPENROUTER_BASE_URL"] = args.llm_url
+    else:
+        stub = StubLLMServer(latency_ms=args.latency_ms, jitter_ms=args.jitter_ms,
+                             error_rate=args.error_rate, seed=args.seed).start()
+        os.environ["OPENROUTER_BASE_URL"] = stub.base_url
+        os.environ.setdefault("OPENROUTER_API_KEY", "stub-key")
+
+    try:
+        report = run_load_test(inventory_df, args.sessions, args.requests,
+                               think_time_ms=args.think_time_ms, seed=args.seed,
+                               coalesce=not args.no_coalesce, intent_model=intent_model)
+    finally:
+        if stub is not None:
+            stub.stop()
+
+    print(format_report(report))
+
+
+if __name__ == "__main__":
+    main()
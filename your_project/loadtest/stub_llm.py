@@ -0,0 +1,164 @@
+import json
+import random
+import re
+import threading
+import time
+import logging
+import argparse
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, Any, Optional
+
+from search.local_parser import CATEGORIES, COLORS
+
+# Set up logging
+logger = logging.getLogger(__name__)
+
+
+def fake_parse(query: str) -> Dict[str, Any]:
+    """
+    Produce a plausible filter dictionary for a query, mimicking the LLM output
+    """
+    query = query.lower()
+    filters: Dict[str, Any] = {}
+
+    for category in CATEGORIES:
+        if category.rstrip('s') in query:
+            filters["category"] = category
+            break
+
+    for color in COLORS:
+        if color in query:
+            filters["color"] = color
+            break
+
+    match = re.search(r'(?:under|below|less than)\s*\$?(\d+)', query)
+    if match:
+        filters["price_max"] = float(match.group(1))
+
+    match = re.search(r'(?:over|above|more than)\s*\$?(\d+)', query)
+    if match:
+        filters["price_min"] = float(match.group(1))
+
+    if "good rating" in query or "well rated" in query or "best" in query:
+        filters["min_rating"] = 4.5
+
+    return filters
+
+
+class StubLLMServer:
+    """
+    OpenRouter-compatible chat completions endpoint for load testing.
+
+    Each request sleeps for a latency drawn around `latency_ms` (uniform
+    +/- `jitter_ms`) and then fails with HTTP 500 with probability
+    `error_rate`; otherwise it answers with a JSON filter object derived
+    from the query embedded in the prompt.
+    """
+
+    def __init__(
+        self,
+        host: str = "127.0.0.1",
+        port: int = 0,
+        latency_ms: float = 300.0,
+        jitter_ms: float = 100.0,
+        error_rate: float = 0.0,
+        seed: Optional[int] = None,
+    ):
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.error_rate = error_rate
+        self.request_count = 0
+        self.error_count = 0
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+        self._server = ThreadingHTTPServer((host, port), self._make_handler())
+        self._server.daemon_threads = True
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def base_url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}/api/v1"
+
+    def start(self) -> "StubLLMServer":
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        logger.info(f"Stub LLM listening on {self.base_url}")
+        return self
+
+    def stop(self) -> None:
+        self._server.shutdown()
+        self._server.server_close()
+
+    def __enter__(self) -> "StubLLMServer":
+        return self.start()
+
+    def __exit__(self, *exc) -> None:
+        self.stop()
+
+    def _draw(self):
+        with self._lock:
+            self.request_count += 1
+            delay = max(0.0, self.latency_ms + self._random.uniform(-self.jitter_ms, self.jitter_ms))
+            fail = self._random.random() < self.error_rate
+            if fail:
+                self.error_count += 1
+        return delay / 1000.0, fail
+
+    def _make_handler(self):
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_POST(self):
+                length = int(self.headers.get("Content-Length", 0))
+                body = json.loads(self.rfile.read(length) or b"{}")
+
+                delay, fail = stub._draw()
+                time.sleep(delay)
+
+                if fail:
+                    self._send(500, {"error": {"message": "stub failure"}})
+                    return
+
+                prompt = body.get("messages", [{}])[-1].get("content", "")
+                match = re.search(r'Query: "(.*)"', prompt)
+                filters = fake_parse(match.group(1) if match else "")
+                self._send(200, {
+                    "id": "stub",
+                    "model": body.get("model", "stub"),
+                    "choices": [{"message": {"role": "assistant", "content": json.dumps(filters)}}],
+                })
+
+            def _send(self, status, payload):
+                data = json.dumps(payload).encode()
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+            def log_message(self, format, *args):
+                pass
+
+        return Handler
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run a stub OpenRouter-compatible LLM server")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8089)
+    parser.add_argument("--latency-ms", type=float, default=300.0)
+    parser.add_argument("--jitter-ms", type=float, default=100.0)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    args = parser.parse_args()
+
+    server = StubLLMServer(args.host, args.port, args.latency_ms, args.jitter_ms, args.error_rate)
+    print(f"Set OPENROUTER_BASE_URL={server.base_url}")
+    try:
+        server._server.serve_forever()
+    except KeyboardInterrupt:
+        server.stop()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1 @@
+# Search pipeline package 
\ No newline at end of file
@@ -0,0 +1,80 @@
+import json
+import threading
+from collections import OrderedDict
+from typing import Dict, Any, Optional, Hashable
+
+import pandas as pd
+
+
+def filters_key(filters: Dict[str, Any]) -> str:
+    """
+    Build a stable cache key for a filter dictionary
+    """
+    return json.dumps(filters, sort_keys=True, default=str)
+
+
+class LRUCache:
+    """
+    Small thread-safe least-recently-used cache
+    """
+
+    def __init__(self, max_entries: int = 256):
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._data: "OrderedDict[Hashable, Any]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        with self._lock:
+            if key not in self._data:
+                self.misses += 1
+                return None
+            self.hits += 1
+            self._data.move_to_end(key)
+            return self._data[key]
+
+    def put(self, key: Hashable, value: Any) -> None:
+        with self._lock:
+            self._data[key] = value
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_entries:
+                self._data.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._data)
+
+
+class FilterResultCache:
+    """
+    Cache of filter_products results keyed by inventory identity and filters
+    """
+
+    def __init__(self, max_entries: int = 256):
+        self._cache = LRUCache(max_entries)
+
+    def get(self, df: pd.DataFrame, filters: Dict[str, Any]) -> Optional[pd.DataFrame]:
+        entry = self._cache.get((id(df), filters_key(filters)))
+        # id() can be reused once an inventory is freed, so check identity too
+        if entry is None or entry[0] is not df:
+            return None
+        return entry[1]
+
+    def put(self, df: pd.DataFrame, filters: Dict[str, Any], result: pd.DataFrame) -> None:
+        self._cache.put((id(df), filters_key(filters)), (df, result))
+
+    def clear(self) -> None:
+        self._cache.clear()
+
+    def __len__(self) -> int:
+        return len(self._cache)
+
+
+# Process-wide caches shared by every session
+parse_cache = LRUCache(max_entries=1024)
+filter_cache = FilterResultCache(max_entries=256)
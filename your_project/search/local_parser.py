@@ -0,0 +1,109 @@
+import re
+import logging
+from typing import Dict, List, Any, Optional
+
+# Set up logging
+logger = logging.getLogger(__name__)
+
+CATEGORIES = ['accessory', 'bag', 'blazer', 'blouse', 'cardigan', 'coat',
+              'dress', 'hoodie', 'jacket', 'jeans', 'shoes', 'skirt',
+              'sweater', 'tshirt', 'socks']
+
+COLORS = ['red', 'blue', 'green', 'black', 'white', 'pink',
+          'purple', 'yellow', 'orange', 'brown', 'gray', 'beige']
+
+EXCLUSION_PATTERN = r'\b(?:not|no|except|without)\s+([a-z]+)'
+
+
+def normalize_query(query: str) -> str:
+    """
+    Normalize a raw query so equivalent inputs share cache entries
+    """
+    return " ".join(query.strip().lower().split())
+
+
+def _mentioned_categories(query: str) -> List[str]:
+    found = []
+    for word in re.findall(r'[a-z-]+', query):
+        for category in CATEGORIES:
+            forms = (category, category + 's', category + 'es', category[:-1] + 'ies')
+            if word in forms and category not in found:
+                found.append(category)
+    return found
+
+
+def _alternatives(query: str, excluded: List[str]) -> Optional[Dict[str, Any]]:
+    """
+    Turn "dresses or skirts" / "red or blue jeans" into IN filters
+    """
+    if ' or ' not in f" {query} ":
+        return None
+
+    filters: Dict[str, Any] = {}
+    categories = _mentioned_categories(query)
+    colors = [c for c in COLORS if re.search(rf'\b{c}\b', query) and c not in excluded]
+    if categories:
+        filters["category"] = categories if len(categories) > 1 else categories[0]
+    if colors:
+        filters["color"] = colors if len(colors) > 1 else colors[0]
+
+    # Only worth it when the "or" actually joined two alternatives
+    if len(categories) > 1 or len(colors) > 1:
+        return filters
+    return None
+
+
+def _with_exclusions(filters: Dict[str, Any], excluded: List[str]) -> Dict[str, Any]:
+    if excluded:
+        filters["expression"] = {"not": {"field": "color", "in": excluded}}
+    return filters
+
+
+def handle_simple_search(query: str) -> Optional[Dict[str, Any]]:
+    """
+    Handle simple keyword searches by inferring filters from basic terms
+    Returns a dictionary with inferred filters
+    
+    "x or y" alternatives become list (IN) filters and "not <color>" becomes
+    a NOT expression, so simple boolean queries skip the LLM as well.
+    """
+    query = query.strip().lower()
+    
+    # Colors the shopper explicitly does not want ("not black", "without red")
+    excluded = [w for w in re.findall(EXCLUSION_PATTERN, query) if w in COLORS]
+    
+    alternatives = _alternatives(query, excluded)
+    if alternatives:
+        logger.info(f"Simple search matched alternatives: {alternatives}")
+        return _with_exclusions(alternatives, excluded)
+
+    # Handle plural forms by removing trailing 's'
+    search_term = query.rstrip('s')
+
+    # Check for exact category match
+    if search_term in CATEGORIES:
+        logger.info(f"Simple search matched category: {search_term}")
+        return _with_exclusions({"category": search_term}, excluded)
+
+    # Check for partial category match
+    for category in CATEGORIES:
+        if search_term in category or category in search_term:
+            logger.info(f"Simple search partially matched category: {category}")
+            return _with_exclusions({"category": category}, excluded)
+
+    # Check for color matches
+    for color in COLORS:
+        if color in query and color not in excluded:
+            logger.info(f"Simple search matched color: {color}")
+            return {"color": color}
+
+    # Try to extract price information
+    price_pattern = r'under\s*\$?(\d+)'
+    match = re.search(price_pattern, query)
+    if match:
+        price = float(match.group(1))
+        logger.info(f"Simple search matched price under: ${price}")
+        return {"price_max": price}
+
+    # If nothing matches, return None to indicate the basic search failed
+    return None
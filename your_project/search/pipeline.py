@@ -0,0 +1,230 @@
+import os
+import time
+import logging
+import pandas as pd
+from typing import Dict, List, Any, Optional, Sequence, Tuple
+
+from inventory.filters import filter_products, get_recommendation_reasons
+from inventory.price_rating_index import PriceRatingIndex, is_band_query, best_in_budget
+from llm.handler import parse_query
+from search.cache import parse_cache, filter_cache, filters_key
+from search.local_parser import handle_simple_search, normalize_query
+from search.singleflight import parse_flights, filter_flights, SingleFlightTimeout
+
+# Set up logging
+logger = logging.getLogger(__name__)
+
+# Confidence above which the local intent model's parse is used instead of the LLM
+DEFAULT_INTENT_MODEL_THRESHOLD = 0.9
+
+
+def parse_search_query(
+    query: str,
+    speculative: Optional[Any] = None,
+    intent_model: Optional[Any] = None,
+    coalesce: bool = True,
+) -> Tuple[Dict[str, Any], str]:
+    """
+    Turn a search query into filters: local parser, parse cache, intent model, then the LLM
+
+    Parameters:
+    - query: Search text as typed by the user
+    - speculative: Optional SpeculativeSearch whose finished work is reused
+    - intent_model: Optional trained IntentModel tried before the LLM
+    - coalesce: Share the parse with identical queries in flight in other sessions
+
+    Returns:
+    - (filters, source): filters is empty when the query was not understood;
+      source is one of local, cache, model, llm, coalesced or timeout
+    """
+    filters = speculative.lookup_filters(query) if speculative is not None else None
+    if filters:
+        logger.info(f"Using speculatively parsed filters: {filters}")
+        return filters, "local"
+
+    filters = handle_simple_search(query)
+    if filters:
+        logger.info(f"Using simple search filters: {filters}")
+        return filters, "local"
+
+    cache_key = normalize_query(query)
+    filters = parse_cache.get(cache_key)
+    if filters:
+        return dict(filters), "cache"
+
+    if not coalesce:
+        filters, source = _parse_uncached(query, cache_key, intent_model)
+        return dict(filters), source
+
+    # Identical queries from other sessions share one parse while it is in flight
+    try:
+        (filters, source), shared = parse_flights.do(
+            cache_key, lambda: _parse_uncached(query, cache_key, intent_model)
+        )
+    except SingleFlightTimeout as e:
+        # The LLM is slow or hung: answer from the intent model if it can, but don't
+        # turn every waiter into another LLM call
+        logger.warning(f"{e}; falling back to the intent model")
+        filters, source = _parse_uncached(query, cache_key, intent_model, use_llm=False)
+        return dict(filters), source
+    return dict(filters), "coalesced" if shared else source
+
+
+def _parse_uncached(
+    query: str,
+    cache_key: str,
+    intent_model: Optional[Any],
+    use_llm: bool = True,
+) -> Tuple[Dict[str, Any], str]:
+    # Another session may have finished the same parse just before this flight started
+    filters = parse_cache.get(cache_key)
+    if filters:
+        return dict(filters), "cache"
+
+    # The local model answers when it is confident enough
+    predicted, confidence = intent_model.predict(query) if intent_model is not None else ({}, 0.0)
+    threshold = float(os.getenv("INTENT_MODEL_THRESHOLD", str(DEFAULT_INTENT_MODEL_THRESHOLD)))
+    if predicted and confidence >= threshold:
+        logger.info(f"Intent model parsed query with confidence {confidence:.2f}: {predicted}")
+        source, filters = "model", predicted
+    elif use_llm:
+        source, filters = "llm", parse_query(query)
+    else:
+        return {}, "timeout"
+    if filters:
+        parse_cache.put(cache_key, dict(filters))
+    return filters or {}, source
+
+
+def filter_search_results(
+    df: pd.DataFrame,
+    filters: Dict[str, Any],
+    speculative: Optional[Any] = None,
+    coalesce: bool = True,
+    price_index: Optional[PriceRatingIndex] = None,
+) -> Tuple[pd.DataFrame, Optional[Sequence[bool]]]:
+    """
+    Select the inventory rows matching the filters
+
+    "Best rated X under $Y" goes straight to the price/rating index when one is
+    given; anything else reuses the speculative pass or the shared cache when
+    they have the result.
+
+    Parameters:
+    - df: Inventory DataFrame
+    - filters: Filters from parse_search_query
+    - speculative: Optional SpeculativeSearch whose finished work is reused
+    - coalesce: Share the filter pass with identical searches in flight in other sessions
+    - price_index: Optional PriceRatingIndex built from df
+
+    Returns:
+    - Matching rows, and per-row "well under budget" flags (None unless the index answered)
+    """
+    if price_index is not None and is_band_query(filters):
+        return best_in_budget(df, filters, price_index)
+
+    filtered_df = speculative.lookup_results(df, filters) if speculative is not None else None
+    if filtered_df is None:
+        filtered_df = filter_cache.get(df, filters)
+    if filtered_df is not None:
+        logger.info("Using precomputed filter results")
+    elif coalesce:
+        try:
+            filtered_df, _ = filter_flights.do((id(df), filters_key(filters)), lambda: _filter_uncached(df, filters))
+        except SingleFlightTimeout as e:
+            logger.warning(f"{e}; filtering independently")
+            filtered_df = _filter_uncached(df, filters)
+    else:
+        filtered_df = _filter_uncached(df, filters)
+    return filtered_df, None
+
+
+def _filter_uncached(df: pd.DataFrame, filters: Dict[str, Any]) -> pd.DataFrame:
+    filtered_df = filter_cache.get(df, filters)
+    if filtered_df is None:
+        filtered_df = filter_products(df, filters)
+        filter_cache.put(df, filters, filtered_df)
+    return filtered_df
+
+
+def run_search(
+    query: str,
+    df: pd.DataFrame,
+    speculative: Optional[Any] = None,
+    intent_model: Optional[Any] = None,
+    coalesce: bool = True,
+    price_index: Optional[PriceRatingIndex] = None,
+) -> Dict[str, Any]:
+    """
+    Run a query through parse, filter and card building, timing each stage
+
+    Parameters:
+    - query: Search text as typed by the user
+    - df: Inventory DataFrame
+    - speculative: Optional SpeculativeSearch whose finished work is reused
+    - intent_model: Optional trained IntentModel tried before the LLM
+    - coalesce: Share parses and filter passes with identical in-flight searches
+    - price_index: Optional PriceRatingIndex built from df, answering band queries
+
+    Returns:
+    - Dictionary with filters, source, filtered_df, well_under_budget, cards and
+      timings_ms; stages after an empty parse are skipped (filtered_df is None)
+    """
+    timings = {}
+    result = {"filters": {}, "source": "local", "filtered_df": None,
+              "well_under_budget": None, "cards": [], "timings_ms": timings}
+
+    stage_start = time.perf_counter()
+    filters, source = parse_search_query(query, speculative, intent_model, coalesce)
+    timings["parse_ms"] = (time.perf_counter() - stage_start) * 1000
+    result.update(filters=filters, source=source)
+    if not filters:
+        return result
+
+    stage_start = time.perf_counter()
+    filtered_df, well_under_budget = filter_search_results(df, filters, speculative, coalesce, price_index)
+    timings["filter_ms"] = (time.perf_counter() - stage_start) * 1000
+    result.update(filtered_df=filtered_df, well_under_budget=well_under_budget)
+    if len(filtered_df) == 0:
+        return result
+
+    stage_start = time.perf_counter()
+    result["cards"] = build_product_cards(filtered_df, filters, well_under_budget)
+    timings["cards_ms"] = (time.perf_counter() - stage_start) * 1000
+    return result
+
+
+def build_product_cards(
+    filtered_df: pd.DataFrame,
+    filters: Dict[str, Any],
+    well_under_budget: Optional[Sequence[bool]] = None,
+) -> List[Dict[str, Any]]:
+    """
+    Turn filtered inventory rows into the product cards shown in the results grid
+
+    Parameters:
+    - filtered_df: DataFrame returned by filter_products
+    - filters: Filter dictionary the rows were selected with
+    - well_under_budget: Optional per-row flags from the price/rating index
+
+    Returns:
+    - List of card dictionaries with a recommendation reason each
+    """
+    product_cards = []
+    for i, (_, row) in enumerate(filtered_df.iterrows()):
+        product = row.to_dict()
+        flag = None if well_under_budget is None else bool(well_under_budget[i])
+        reason = get_recommendation_reasons(product, filters, well_under_budget=flag)
+
+        product_cards.append({
+            "id": product.get('id', 0),
+            "name": product.get('name', 'Unknown Product'),
+            "price": product.get('price', 0),
+            "image_url": product.get('image_url', ''),
+            "reason": reason,
+            "color": product.get('color', 'N/A'),
+            "category": product.get('category', 'N/A'),
+            "rating": product.get('rating', 0)
+        })
+
+    return product_cards
@@ -0,0 +1,229 @@
+import os
+import json
+import time
+import queue
+import atexit
+import logging
+import argparse
+import threading
+from collections import Counter, defaultdict
+from pathlib import Path
+from typing import Dict, List, Any, Iterator, Optional
+
+import pandas as pd
+
+from search.cache import filters_key, parse_cache, filter_cache
+from search.local_parser import normalize_query
+
+# Set up logging
+logger = logging.getLogger(__name__)
+
+SEGMENT_PREFIX = "queries-"
+SEGMENT_SUFFIX = ".jsonl"
+
+
+class QueryLogWriter:
+    """
+    Append-only structured query log written by a background thread.
+
+    `log()` only enqueues the record, so the request path never touches the
+    disk. The writer thread drains the queue in batches, appends compact JSON
+    lines to the current segment and starts a new segment once it grows past
+    `max_segment_bytes`. If the queue is full the record is dropped and
+    counted rather than blocking the caller.
+    """
+
+    def __init__(
+        self,
+        log_dir: str,
+        batch_size: int = 256,
+        flush_interval: float = 1.0,
+        max_segment_bytes: int = 16 * 1024 * 1024,
+        max_queue: int = 10000,
+    ):
+        self.log_dir = Path(log_dir)
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.max_segment_bytes = max_segment_bytes
+        self.dropped = 0
+        self.written = 0
+
+        self.log_dir.mkdir(parents=True, exist_ok=True)
+        self._queue: "queue.Queue[Optional[Dict[str, Any]]]" = queue.Queue(maxsize=max_queue)
+        self._segment: Optional[Path] = None
+        self._segment_seq = 0
+        self._closed = False
+        self._thread = threading.Thread(target=self._run, name="query-log-writer", daemon=True)
+        self._thread.start()
+        atexit.register(self.close)
+
+    def log(self, record: Dict[str, Any]) -> None:
+        """
+        Enqueue a record for writing; never blocks
+        """
+        if self._closed:
+            return
+        record.setdefault("ts", time.time())
+        try:
+            self._queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+    def close(self, timeout: float = 5.0) -> None:
+        """
+        Flush outstanding records and stop the writer thread
+        """
+        if self._closed:
+            return
+        self._closed = True
+        self._queue.put(None)
+        self._thread.join(timeout)
+
+    def _run(self) -> None:
+        stop = False
+        while not stop:
+            batch = []
+            deadline = time.monotonic() + self.flush_interval
+            while len(batch) < self.batch_size:
+                try:
+                    record = self._queue.get(timeout=max(0.0, deadline - time.monotonic()))
+                except queue.Empty:
+                    break
+                if record is None:
+                    stop = True
+                    break
+                batch.append(record)
+
+            if batch:
+                try:
+                    self._write(batch)
+                except Exception as e:
+                    logger.error(f"Failed to write {len(batch)} query log records: {e}")
+
+    def _write(self, batch: List[Dict[str, Any]]) -> None:
+        lines = "".join(
+            json.dumps(record, separators=(",", ":"), default=str) + "\n" for record in batch
+        )
+        path = self._current_segment()
+        with open(path, "a", encoding="utf-8") as f:
+            f.write(lines)
+        self.written += len(batch)
+
+    def _current_segment(self) -> Path:
+        if self._segment is None or (
+            self._segment.exists() and self._segment.stat().st_size >= self.max_segment_bytes
+        ):
+            self._segment_seq += 1
+            stamp = time.strftime("%Y%m%d-%H%M%S")
+            self._segment = self.log_dir / f"{SEGMENT_PREFIX}{stamp}-{os.getpid()}-{self._segment_seq:04d}{SEGMENT_SUFFIX}"
+        return self._segment
+
+
+def iter_log_records(log_dir: str) -> Iterator[Dict[str, Any]]:
+    """
+    Yield every record from all log segments, oldest segment first
+    """
+    for path in sorted(Path(log_dir).glob(f"{SEGMENT_PREFIX}*{SEGMENT_SUFFIX}")):
+        with open(path, encoding="utf-8") as f:
+            for line in f:
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    yield json.loads(line)
+                except json.JSONDecodeError:
+                    # A crash can leave a partial last line; skip it
+                    logger.warning(f"Skipping malformed query log line in {path.name}")
+
+
+def aggregate_top_queries(log_dir: str, n: int = 100) -> List[Dict[str, Any]]:
+    """
+    Compute the most frequent normalized queries and their most common filters
+
+    Parameters:
+    - log_dir: Directory containing query log segments
+    - n: Number of top queries to return
+
+    Returns:
+    - List of {query, count, filters, source} dictionaries, most frequent first
+    """
+    counts: Counter = Counter()
+    filter_counts: Dict[str, Counter] = defaultdict(Counter)
+    filter_values: Dict[str, Dict[str, Any]] = {}
+    sources: Dict[str, Counter] = defaultdict(Counter)
+
+    for record in iter_log_records(log_dir):
+        query = normalize_query(record.get("query", ""))
+        if not query:
+            continue
+        counts[query] += 1
+        filters = record.get("filters")
+        if filters:
+            key = filters_key(filters)
+            filter_counts[query][key] += 1
+            filter_values[key] = filters
+        if record.get("source"):
+            sources[query][record["source"]] += 1
+
+    top = []
+    for query, count in counts.most_common(n):
+        filters = None
+        if filter_counts[query]:
+            filters = filter_values[filter_counts[query].most_common(1)[0][0]]
+        source = sources[query].most_common(1)[0][0] if sources[query] else None
+        top.append({"query": query, "count": count, "filters": filters, "source": source})
+    return top
+
+
+def warm_caches(top_queries: List[Dict[str, Any]], inventory_df: Optional[pd.DataFrame], filter_fn) -> int:
+    """
+    Pre-populate the process-wide parse and filter caches from top queries
+
+    Parameters:
+    - top_queries: Output of aggregate_top_queries
+    - inventory_df: Inventory the filter cache should be warmed for
+    - filter_fn: Filter function, normally filter_products
+
+    Returns:
+    - Number of queries warmed
+    """
+    warmed = 0
+    for entry in top_queries:
+        filters = entry.get("filters")
+        if not filters:
+            continue
+        parse_cache.put(normalize_query(entry["query"]), filters)
+        if inventory_df is not None and filter_cache.get(inventory_df, filters) is None:
+            filter_cache.put(inventory_df, filters, filter_fn(inventory_df, filters))
+        warmed += 1
+
+    logger.info(f"Warmed caches with {warmed} top queries")
+    return warmed
+
+
+def load_top_queries(path: str) -> List[Dict[str, Any]]:
+    """
+    Load a top-queries file written by the aggregator; missing file means none
+    """
+    if not os.path.exists(path):
+        return []
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Aggregate the query log into a top-queries file")
+    parser.add_argument("--log-dir", default=os.getenv("QUERY_LOG_DIR", "logs/queries"))
+    parser.add_argument("--output", default=os.getenv("QUERY_LOG_TOP_QUERIES", "logs/top_queries.json"))
+    parser.add_argument("-n", type=int, default=100, help="Number of top queries to keep")
+    args = parser.parse_args()
+
+    top = aggregate_top_queries(args.log_dir, args.n)
+    Path(args.output).parent.mkdir(parents=True, exist_ok=True)
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump(top, f, indent=2)
+    print(f"Wrote {len(top)} top queries to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,120 @@
+import time
+import logging
+import threading
+from concurrent.futures import Future, TimeoutError as FutureTimeoutError
+from typing import Dict, Any, Callable, Hashable, Optional, Tuple
+
+# Set up logging
+logger = logging.getLogger(__name__)
+
+# How long identical requests wait for an in-flight parse (LLM) or filter pass.
+# The parse wait must stay above llm.handler.LLM_TIMEOUT_SECONDS (connect + read).
+PARSE_TIMEOUT_SECONDS = 30.0
+FILTER_TIMEOUT_SECONDS = 10.0
+
+
+class SingleFlightTimeout(TimeoutError):
+    """Raised to a caller that waited longer than the key's timeout for a shared call"""
+
+
+class _Flight:
+    def __init__(self, timeout: float):
+        self.future: Future = Future()
+        self.deadline = time.monotonic() + timeout
+        self.waiters = 0
+
+
+class SingleFlight:
+    """
+    Process-wide de-duplication of identical concurrent calls.
+
+    The first caller for a key runs the function; callers arriving while it
+    is still running wait on the same future and receive its result, or
+    its exception. A flight that outlives its timeout stops accepting new
+    waiters, so a hung call cannot hold a key forever. Results are shared
+    between callers and must be treated as read-only.
+    """
+
+    def __init__(self, name: str, timeout: float = 30.0):
+        self.name = name
+        self.timeout = timeout
+        self._flights: Dict[Hashable, _Flight] = {}
+        self._lock = threading.Lock()
+        self.executed = 0
+        self.collapsed = 0
+        self.failed = 0
+        self.timed_out = 0
+
+    def do(self, key: Hashable, fn: Callable[[], Any], timeout: Optional[float] = None) -> Tuple[Any, bool]:
+        """
+        Run fn() once for all concurrent callers with the same key
+
+        Parameters:
+        - key: Normalized request key
+        - fn: Zero-argument function computing the result
+        - timeout: Seconds a new flight accepts waiters, and the longest this
+          caller waits on an existing one (defaults to the instance timeout)
+
+        Returns:
+        - (result, shared): shared is True when the result came from another caller's call
+
+        Raises SingleFlightTimeout if the shared call did not finish in time,
+        or the exception the shared call raised.
+        """
+        timeout = self.timeout if timeout is None else timeout
+        now = time.monotonic()
+        with self._lock:
+            flight = self._flights.get(key)
+            if flight is not None and now < flight.deadline:
+                flight.waiters += 1
+                self.collapsed += 1
+                leader = False
+            else:
+                flight = _Flight(timeout)
+                self._flights[key] = flight
+                self.executed += 1
+                leader = True
+
+        if not leader:
+            try:
+                return flight.future.result(timeout=max(min(timeout, flight.deadline - now), 0.0)), True
+            except FutureTimeoutError:
+                with self._lock:
+                    self.timed_out += 1
+                raise SingleFlightTimeout(f"{self.name}: timed out waiting for in-flight call for {key!r}")
+
+        try:
+            result = fn()
+        except BaseException as e:
+            with self._lock:
+                self.failed += 1
+            flight.future.set_exception(e)
+            raise
+        else:
+            flight.future.set_result(result)
+            return result, False
+        finally:
+            with self._lock:
+                # A timed-out flight may already have been replaced by a newer one
+                if self._flights.get(key) is flight:
+                    del self._flights[key]
+                if flight.waiters:
+                    logger.info(f"{self.name}: {flight.waiters} identical calls shared one result")
+
+    def stats(self) -> Dict[str, int]:
+        """
+        Counters since start: calls run, calls collapsed onto another, failures, waiter timeouts
+        """
+        with self._lock:
+            return {
+                "executed": self.executed,
+                "collapsed": self.collapsed,
+                "failed": self.failed,
+                "timed_out": self.timed_out,
+                "in_flight": len(self._flights),
+            }
+
+
+# Shared by every session in the process, like the caches in search.cache
+parse_flights = SingleFlight("parse", PARSE_TIMEOUT_SECONDS)
+filter_flights = SingleFlight("filter", FILTER_TIMEOUT_SECONDS)
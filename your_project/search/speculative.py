@@ -0,0 +1,136 @@
+import logging
+import threading
+from collections import OrderedDict
+from typing import Callable, Dict, Any, Optional, Tuple
+
+import pandas as pd
+
+from search.cache import filters_key
+from search.local_parser import normalize_query
+
+# Set up logging
+logger = logging.getLogger(__name__)
+
+
+class SpeculativeSearch:
+    """
+    Precompute search results while the user is still typing.
+
+    Each input change schedules a debounced background job that runs the cheap
+    local parser and, if it yields filters, the filter stage. Results are kept
+    in a small LRU so the real search can pick them up instantly. Any newer
+    input cancels the pending job and discards the output of a running one.
+    """
+
+    def __init__(
+        self,
+        parse_fn: Callable[[str], Optional[Dict[str, Any]]],
+        filter_fn: Callable[[pd.DataFrame, Dict[str, Any]], pd.DataFrame],
+        debounce_seconds: float = 0.3,
+        max_entries: int = 8,
+    ):
+        self.parse_fn = parse_fn
+        self.filter_fn = filter_fn
+        self.debounce_seconds = debounce_seconds
+        self.max_entries = max_entries
+
+        self._lock = threading.Lock()
+        self._generation = 0
+        self._timer: Optional[threading.Timer] = None
+        self._parsed: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self._results: "OrderedDict[Tuple[int, str], Tuple[pd.DataFrame, pd.DataFrame]]" = OrderedDict()
+
+    def update(self, query: str, df: Optional[pd.DataFrame]) -> None:
+        """
+        Register a new input value and schedule speculative work for it
+        """
+        query = normalize_query(query or "")
+        with self._lock:
+            self._generation += 1
+            generation = self._generation
+            if self._timer is not None:
+                self._timer.cancel()
+                self._timer = None
+
+            if not query or df is None:
+                return
+
+            self._timer = threading.Timer(
+                self.debounce_seconds, self._run, args=(generation, query, df)
+            )
+            self._timer.daemon = True
+            self._timer.start()
+
+    def cancel(self) -> None:
+        """
+        Cancel pending speculative work and ignore any job still running
+        """
+        with self._lock:
+            self._generation += 1
+            if self._timer is not None:
+                self._timer.cancel()
+                self._timer = None
+
+    def lookup_filters(self, query: str) -> Optional[Dict[str, Any]]:
+        """
+        Return the speculatively parsed filters for a query, if available
+        """
+        key = normalize_query(query or "")
+        with self._lock:
+            filters = self._parsed.get(key)
+            if filters is not None:
+                self._parsed.move_to_end(key)
+                return dict(filters)
+        return None
+
+    def lookup_results(self, df: pd.DataFrame, filters: Dict[str, Any]) -> Optional[pd.DataFrame]:
+        """
+        Return precomputed filter results for these filters on this inventory
+        """
+        key = (id(df), filters_key(filters))
+        with self._lock:
+            entry = self._results.get(key)
+            # id() can be reused once an inventory is freed, so check identity too
+            if entry is None or entry[0] is not df:
+                return None
+            self._results.move_to_end(key)
+        return entry[1]
+
+    def _is_current(self, generation: int) -> bool:
+        with self._lock:
+            return generation == self._generation
+
+    def _run(self, generation: int, query: str, df: pd.DataFrame) -> None:
+        try:
+            if not self._is_current(generation):
+                return
+
+            filters = self.parse_fn(query)
+            if not filters or not self._is_current(generation):
+                return
+
+            result_key = (id(df), filters_key(filters))
+            with self._lock:
+                entry = self._results.get(result_key)
+                cached = entry is not None and entry[0] is df
+
+            filtered_df = None if cached else self.filter_fn(df, filters)
+
+            with self._lock:
+                # A newer keystroke arrived while we were working; drop the result
+                if generation != self._generation:
+                    return
+                self._remember(self._parsed, query, filters)
+                if filtered_df is not None:
+                    self._remember(self._results, result_key, (df, filtered_df))
+
+            logger.info(f"Speculative search prepared filters {filters} for '{query}'")
+
+        except Exception as e:
+            logger.warning(f"Speculative search failed for '{query}': {e}")
+
+    def _remember(self, cache: OrderedDict, key, value) -> None:
+        cache[key] = value
+        cache.move_to_end(key)
+        while len(cache) > self.max_entries:
+            cache.popitem(last=False)
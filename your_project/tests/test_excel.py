@@ -0,0 +1,102 @@
+import unittest
+import os
+import tempfile
+import pandas as pd
+import sys
+from pathlib import Path
+from unittest import mock
+
+# Add project root to path
+project_root = Path(__file__).parent.parent
+sys.path.append(str(project_root))
+
+from inventory.filters import load_inventory
+from inventory.excel import read_excel_streaming
+
+
+class TestExcelIngestion(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.workbook = os.path.join(self.tmp.name, 'inventory.xlsx')
+        self.cache_dir = os.path.join(self.tmp.name, 'cache')
+
+        dresses = pd.DataFrame({
+            'Name ': ['Red Dress', 'Blue Dress', None],
+            'Category': ['dress', 'dress', None],
+            'Price': [150.0, '99.5', None],
+            'Rating': [4.5, 4.1, None],
+        })
+        shoes = pd.DataFrame({
+            'Name ': ['Sneakers'],
+            'Category': ['shoes'],
+            'Price': [80.0],
+            'Rating': [4.2],
+        })
+        with pd.ExcelWriter(self.workbook) as writer:
+            dresses.to_excel(writer, sheet_name='Dresses', index=False)
+            shoes.to_excel(writer, sheet_name='Shoes', index=False)
+            pd.DataFrame().to_excel(writer, sheet_name='Empty', index=False)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_reads_all_sheets_with_progress(self):
+        progress = []
+        df = read_excel_streaming(self.workbook, workers=2, chunk_rows=1,
+                                  progress=lambda sheet, rows: progress.append((sheet, rows)))
+
+        self.assertEqual(list(df['name']), ['Red Dress', 'Blue Dress', None, 'Sneakers'])
+        self.assertIn(('Dresses', 3), progress)
+        self.assertIn(('Shoes', 1), progress)
+
+    def test_load_inventory_validates_and_caches(self):
+        with mock.patch.dict(os.environ, {"INVENTORY_CACHE_DIR": self.cache_dir}):
+            df = load_inventory(self.workbook)
+
+            self.assertEqual(list(df.columns), ['name', 'category', 'price', 'rating'])
+            self.assertEqual(len(df), 3)
+            self.assertTrue(pd.api.types.is_numeric_dtype(df['price']))
+            self.assertEqual(df['price'].tolist(), [150.0, 99.5, 80.0])
+            self.assertEqual(len(os.listdir(self.cache_dir)), 1)
+
+            with mock.patch('inventory.excel.read_excel_streaming') as reader, \
+                    mock.patch('inventory.filters.validate_inventory') as validate:
+                cached = load_inventory(self.workbook)
+                reader.assert_not_called()
+                validate.assert_not_called()
+
+        pd.testing.assert_frame_equal(df, cached)
+
+    def test_cache_entries_from_another_version_are_ignored(self):
+        with mock.patch.dict(os.environ, {"INVENTORY_CACHE_DIR": self.cache_dir}):
+            load_inventory(self.workbook)
+            with mock.patch('inventory.excel.INVENTORY_CACHE_VERSION', -1):
+                df = load_inventory(self.workbook)
+
+        self.assertEqual(len(df), 3)
+        self.assertEqual(len(os.listdir(self.cache_dir)), 2)
+
+    def test_sheet_headers_differing_in_case_are_merged(self):
+        workbook = os.path.join(self.tmp.name, 'mixed.xlsx')
+        with pd.ExcelWriter(workbook) as writer:
+            pd.DataFrame({'Name': ['Red Dress'], 'Category': ['dress'], 'Price': [150.0]}).to_excel(
+                writer, sheet_name='Upper', index=False)
+            pd.DataFrame({'name': ['Sneakers'], 'category': ['shoes'], 'price': [80.0]}).to_excel(
+                writer, sheet_name='Lower', index=False)
+
+        with mock.patch.dict(os.environ, {"INVENTORY_CACHE_DIR": self.cache_dir}):
+            df = load_inventory(workbook)
+
+        self.assertEqual(list(df.columns), ['name', 'category', 'price'])
+        self.assertEqual(list(df['name']), ['Red Dress', 'Sneakers'])
+
+    def test_missing_required_columns(self):
+        path = os.path.join(self.tmp.name, 'bad.csv')
+        pd.DataFrame({'name': ['Red Dress']}).to_csv(path, index=False)
+        with self.assertRaises(ValueError):
+            load_inventory(path)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,119 @@
+import unittest
+import io
+import os
+import json
+import tempfile
+import importlib.util
+import numpy as np
+import pandas as pd
+import sys
+from pathlib import Path
+
+# Add project root to path
+project_root = Path(__file__).parent.parent
+sys.path.append(str(project_root))
+
+from inventory.export import iter_matches, write_csv, export_results
+from inventory.filters import filter_products, get_recommendation_reasons
+
+
+class TestExport(unittest.TestCase):
+
+    def setUp(self):
+        rng = np.random.default_rng(3)
+        n = 2000
+        self.df = pd.DataFrame({
+            'name': [f'Product {i}' for i in range(n)],
+            'category': rng.choice(['dress', 'shoes', 'bag'], n),
+            'color': rng.choice(['red', 'blue', 'black'], n),
+            'price': np.round(rng.uniform(5, 300, n), 2),
+            'rating': np.round(rng.uniform(3, 5, n), 1),
+        })
+        self.filters = {'category': 'dress', 'price_max': 150.0, 'min_rating': 4.0}
+        self.tmp = tempfile.TemporaryDirectory()
+        self.csv_path = os.path.join(self.tmp.name, 'inventory.csv')
+        self.df.to_csv(self.csv_path, index=False)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def expected(self):
+        return filter_products(self.df, self.filters)
+
+    def test_streams_csv_in_bounded_chunks(self):
+        chunks = list(iter_matches(self.csv_path, self.filters, chunksize=300))
+        self.assertGreater(len(chunks), 1)
+        self.assertTrue(all(len(chunk) <= 300 for chunk in chunks))
+
+        result = pd.concat(chunks, ignore_index=True)
+        self.assertEqual(list(result['name']), list(self.expected()['name']))
+        first = result.iloc[0].to_dict()
+        self.assertEqual(first['reason'], get_recommendation_reasons(first, self.filters))
+
+    def test_csv_and_jsonl_exports_match(self):
+        csv_out = os.path.join(self.tmp.name, 'out', 'matches.csv')
+        jsonl_out = os.path.join(self.tmp.name, 'out', 'matches.jsonl')
+        self.assertEqual(export_results(self.csv_path, self.filters, csv_out, chunksize=250), len(self.expected()))
+        self.assertEqual(export_results(self.df, self.filters, jsonl_out, chunksize=250), len(self.expected()))
+
+        from_csv = pd.read_csv(csv_out)
+        with open(jsonl_out) as f:
+            records = [json.loads(line) for line in f]
+        self.assertEqual(list(from_csv['name']), [r['name'] for r in records])
+        self.assertEqual(list(from_csv['reason']), [r['reason'] for r in records])
+        # Temporary files are renamed into place
+        self.assertEqual(sorted(os.listdir(os.path.join(self.tmp.name, 'out'))), ['matches.csv', 'matches.jsonl'])
+
+    def test_no_matches_and_bad_format(self):
+        buffer = io.StringIO()
+        self.assertEqual(write_csv(iter_matches(self.df, {'category': 'coat'}), buffer), 0)
+        self.assertEqual(buffer.getvalue(), '')
+        with self.assertRaises(ValueError):
+            export_results(self.df, self.filters, os.path.join(self.tmp.name, 'matches.xml'))
+
+    @unittest.skipUnless(importlib.util.find_spec('pyarrow'), 'pyarrow not installed')
+    def test_parquet_export(self):
+        out = os.path.join(self.tmp.name, 'matches.parquet')
+        export_results(self.csv_path, self.filters, out, chunksize=400)
+        result = pd.read_parquet(out)
+        self.assertEqual(list(result['name']), list(self.expected()['name']))
+
+    @unittest.skipUnless(importlib.util.find_spec('pyarrow'), 'pyarrow not installed')
+    def test_parquet_schema_survives_type_drift_between_chunks(self):
+        df = pd.DataFrame({
+            'name': ['A', 'B', 'C', 'D', 'E', 'F'],
+            'category': ['dress'] * 6,
+            'price': [10.0, 20.0, 30.0, 40.0, 50.0, 60.0],
+            'rating': [4.0, None, 4.5, 3.0, None, 5.0],
+            'sku': ['1', '2', 'X3', 'X4', '5', None],
+            'note': [None, None, 'new', 'sale', 7, None],
+        })
+        path = os.path.join(self.tmp.name, 'drift.csv')
+        df.to_csv(path, index=False)
+
+        for source in (path, df):
+            out = os.path.join(self.tmp.name, 'drift.parquet')
+            self.assertEqual(export_results(source, {'category': 'dress'}, out, chunksize=2), 6)
+            result = pd.read_parquet(out)
+            self.assertEqual(list(result['sku'][:5]), ['1', '2', 'X3', 'X4', '5'])
+            self.assertTrue(pd.isna(result['sku'][5]))
+            self.assertEqual(list(result['note'][2:5]), ['new', 'sale', '7'])
+            self.assertEqual(list(result['price']), list(df['price']))
+
+    @unittest.skipUnless(importlib.util.find_spec('pyarrow'), 'pyarrow not installed')
+    def test_parquet_export_survives_whole_prices_in_the_first_chunk(self):
+        path = os.path.join(self.tmp.name, 'whole.csv')
+        with open(path, 'w') as f:
+            f.write("name,category,price,rating\nA,dress,10,4\nB,dress,20,5\nC,dress,19.99,4.5\nD,dress,,\n")
+
+        out = os.path.join(self.tmp.name, 'whole.parquet')
+        self.assertEqual(export_results(path, {'category': 'dress'}, out, chunksize=2), 4)
+        result = pd.read_parquet(out)
+        self.assertEqual(str(result['price'].dtype), 'float64')
+        self.assertEqual(list(result['price'][:3]), [10.0, 20.0, 19.99])
+        self.assertEqual(list(result['rating'][:3]), [4.0, 5.0, 4.5])
+        self.assertTrue(pd.isna(result['price'][3]))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,91 @@
+import unittest
+import pandas as pd
+import sys
+from pathlib import Path
+
+# Add project root to path
+project_root = Path(__file__).parent.parent
+sys.path.append(str(project_root))
+
+from inventory.filters import filter_products
+from inventory.expressions import parse_expression, compile_filters, plan_filters, And, Range, Eq
+from search.local_parser import handle_simple_search
+
+
+class TestExpressions(unittest.TestCase):
+
+    def setUp(self):
+        self.df = pd.DataFrame({
+            'id': [1, 2, 3, 4, 5],
+            'name': ['Red Dress', 'Blue Jeans', 'Black Leather Jacket', 'Green Shirt', 'Brown Leather Boots'],
+            'description': ['A beautiful dress', 'Classic jeans', 'Stylish jacket', 'Casual shirt', 'Sturdy boots'],
+            'price': [150.0, 80.0, 250.0, 30.0, 120.0],
+            'color': ['Red', 'blue', 'black', 'green', 'brown'],
+            'category': ['dress', 'pants', 'jacket', 'shirt', 'shoes'],
+            'rating': [4.5, 4.2, 4.8, 3.9, None]
+        })
+
+    def names(self, filters):
+        return list(filter_products(self.df, filters)['name'])
+
+    def test_or_and_not(self):
+        expression = {"or": [
+            {"field": "color", "eq": "red"},
+            {"and": [{"contains": "leather"}, {"not": {"field": "color", "in": ["black"]}}]}
+        ]}
+        self.assertEqual(self.names({"expression": expression}), ['Red Dress', 'Brown Leather Boots'])
+
+    def test_in_and_ranges_on_any_numeric_column(self):
+        filters = {"expression": {"and": [
+            {"field": "category", "in": ["Dress", "jacket", "shoes"]},
+            {"field": "id", "min": 2, "max": 5},
+        ]}}
+        self.assertEqual(self.names(filters), ['Black Leather Jacket', 'Brown Leather Boots'])
+
+    def test_missing_values_never_match_ranges(self):
+        self.assertNotIn('Brown Leather Boots', self.names({"min_rating": 0}))
+        self.assertIn('Brown Leather Boots', self.names({"expression": {"not": {"field": "rating", "min": 0}}}))
+
+    def test_dict_keys_and_expression_are_anded(self):
+        filters = {"price_max": 200, "expression": {"field": "description", "contains": "DRESS"}}
+        self.assertEqual(self.names(filters), ['Red Dress'])
+
+    def test_list_filters_compile_to_in(self):
+        self.assertEqual(self.names({"color": ["red", "BLUE"]}), ['Red Dress', 'Blue Jeans'])
+
+    def test_empty_filters_return_everything(self):
+        self.assertEqual(len(filter_products(self.df, {})), 5)
+        self.assertIsNone(compile_filters({"category": "", "price_min": None}))
+
+    def test_in_place_edits_are_seen(self):
+        self.assertEqual(self.names({"category": "dress"}), ['Red Dress'])
+        self.df['category'] = ['jeans'] * 5
+        self.assertEqual(self.names({"category": "dress"}), [])
+        self.df.loc[0, 'price'] = 10.0
+        self.assertEqual(self.names({"price_max": 20}), ['Red Dress'])
+
+    def test_unknown_columns_match_nothing(self):
+        self.assertEqual(self.names({"expression": {"field": "material", "eq": "leather"}}), [])
+        self.assertEqual(self.names({"expression": {"field": "weight", "max": 3}}), [])
+        self.assertEqual(len(self.names({"expression": {"not": {"field": "material", "in": ["silk"]}}})), 5)
+
+    def test_invalid_expressions(self):
+        for bad in [[], {"or": []}, {"field": "price", "min": "cheap"}, {"field": "color"}, {"eq": "red"}]:
+            with self.assertRaises(ValueError):
+                parse_expression(bad)
+
+    def test_most_selective_predicate_runs_first(self):
+        plan = plan_filters(self.df, {"price_min": 10, "category": "dress"})
+        self.assertIsInstance(plan.expr, And)
+        self.assertAlmostEqual(plan.selectivity(Eq('category', 'dress')), 0.2)
+        self.assertAlmostEqual(plan.selectivity(Range('price', 10, None)), 1.0)
+        self.assertIsInstance(plan._ordered(plan.expr)[0], Eq)
+
+    def test_local_parser_targets_expressions(self):
+        filters = handle_simple_search("leather shoes or jackets not black")
+        self.assertEqual(filters["category"], ['shoes', 'jacket'])
+        self.assertEqual(self.names(filters), ['Brown Leather Boots'])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,145 @@
+import unittest
+import os
+import json
+import random
+import tempfile
+import sys
+from pathlib import Path
+
+# Add project root to path
+project_root = Path(__file__).parent.parent
+sys.path.append(str(project_root))
+
+from llm.intent_model import IntentModel, train_intent_model, is_representable
+from llm.evaluate_intent_model import evaluate
+from llm.train_intent_model import split_pairs, load_training_pairs
+from search.query_log import SEGMENT_PREFIX, SEGMENT_SUFFIX
+
+CATEGORIES = ['dress', 'shoes', 'jeans', 'jacket', 'bag']
+COLORS = ['red', 'blue', 'black', 'white']
+
+
+def generate_pairs(n, seed):
+    """Synthetic stand-in for logged (query, LLM filters) pairs"""
+    rng = random.Random(seed)
+    pairs = []
+    for _ in range(n):
+        filters, words = {}, [rng.choice(['show me', 'i want', 'find', ''])]
+        color = rng.choice(COLORS + [None])
+        if color:
+            filters['color'] = color
+            words.append(color)
+        category = rng.choice(CATEGORIES + [None])
+        if category:
+            filters['category'] = category
+            words.append(category)
+        else:
+            words.append('things')
+        roll = rng.random()
+        if roll < 0.4:
+            price = rng.choice([50, 100, 150])
+            filters['price_max'] = float(price)
+            words.append(rng.choice(['under $%d', 'below %d']) % price)
+        elif roll < 0.6:
+            price = rng.choice([20, 40])
+            filters['price_min'] = float(price)
+            words.append('over $%d' % price)
+        if rng.random() < 0.2:
+            filters['min_rating'] = 4.5
+            words.append('rated 4.5 or more')
+        pairs.append((' '.join(w for w in words if w), filters))
+    return pairs
+
+
+def generate_complex_pairs(n, seed):
+    """Logged parses the model cannot represent: category lists and NOT expressions"""
+    rng = random.Random(seed)
+    pairs = []
+    for _ in range(n):
+        first, second = rng.sample(CATEGORIES, 2)
+        color = rng.choice(COLORS)
+        shape = rng.random()
+        if shape < 0.4:
+            pairs.append((f"{first} and {second}", {'category': [first, second]}))
+        elif shape < 0.7:
+            pairs.append((f"{first} or {second} in {color}", {'category': [first, second], 'color': color}))
+        else:
+            pairs.append((f"{first} that are not {color}",
+                          {'category': first, 'expression': {'not': {'field': 'color', 'eq': color}}}))
+    return pairs
+
+
+class TestIntentModel(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        pairs = generate_pairs(600, seed=0) + generate_complex_pairs(100, seed=0)
+        cls.model = train_intent_model(pairs, dim=2 ** 12, number_dim=2 ** 10, epochs=10)
+
+    def test_learns_fields_from_pairs(self):
+        report = evaluate(self.model, generate_pairs(150, seed=1), threshold=0.5)
+        self.assertGreaterEqual(report['exact_match'], 0.9)
+        self.assertGreater(report['coverage'], 0.5)
+        self.assertGreater(report['latency_us']['p50'], 0)
+
+        filters, confidence = self.model.predict('find blue jeans under $100')
+        self.assertEqual(filters, {'color': 'blue', 'category': 'jeans', 'price_max': 100.0})
+        self.assertGreater(confidence, 0.5)
+
+    def test_lists_and_expressions_are_left_to_the_llm(self):
+        for query in ['coats that are not red', 'jacket and bag', 'shoes or dress in black']:
+            filters, confidence = self.model.predict(query)
+            self.assertEqual(confidence, 0.0, query)
+
+        # The field classifiers never learn a list as "no category"
+        filters, _ = self.model.predict('red dress')
+        self.assertEqual(filters.get('category'), 'dress')
+
+    def test_evaluation_compares_whole_filters(self):
+        gold = {'category': 'jacket', 'expression': {'not': {'field': 'color', 'eq': 'red'}}}
+        report = evaluate(self.model, [('jacket that are not red', gold)], threshold=0.5)
+        self.assertEqual(report['exact_match'], 0.0)
+        self.assertEqual(report['coverage'], 0.0)
+        self.assertEqual(report['field_accuracy']['expression'], 0.0)
+
+        report = evaluate(self.model, [('jeans', {'category': ['JEANS']})], threshold=0.0)
+        self.assertEqual(report['exact_match'], 0.0)
+
+    def test_representable_filters(self):
+        self.assertTrue(is_representable({'category': 'dress', 'price_max': 100.0, 'color': None}))
+        self.assertFalse(is_representable({'category': ['dress', 'skirt']}))
+        self.assertFalse(is_representable({'expression': {'contains': 'leather'}}))
+
+    def test_save_and_load_roundtrip(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, 'model.npz')
+            self.model.save(path)
+            loaded = IntentModel.load(path)
+
+        query = 'black jacket over $40'
+        self.assertEqual(loaded.predict(query), self.model.predict(query))
+
+    def test_only_llm_parses_are_training_labels(self):
+        with tempfile.TemporaryDirectory() as log_dir:
+            records = [
+                {"query": "red dresses under $200", "filters": {"category": "dress"}, "source": "local"},
+                {"query": "a gift for my sister", "filters": {"category": "bag"}, "source": "llm"},
+                {"query": "warm coat", "filters": {"category": "coat"}, "source": "model"},
+                {"query": "warm coat", "filters": {"category": "coat"}, "source": "cache"},
+                {"query": "warm coat", "filters": {"category": "coat"}, "source": "coalesced"},
+            ]
+            with open(os.path.join(log_dir, f"{SEGMENT_PREFIX}0{SEGMENT_SUFFIX}"), 'w') as f:
+                f.writelines(json.dumps(r) + "\n" for r in records)
+
+            self.assertEqual(load_training_pairs(log_dir), [("a gift for my sister", {"category": "bag"})])
+
+    def test_split_keeps_queries_apart(self):
+        pairs = [('Red Dress', {}), ('red dress ', {}), ('shoes', {}), ('bag', {})]
+        train, test = split_pairs(pairs, holdout=0.5)
+        train_queries = {q.strip().lower() for q, _ in train}
+        self.assertFalse(train_queries & {q.strip().lower() for q, _ in test})
+        self.assertEqual(len(train) + len(test), 4)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,97 @@
+import unittest
+import os
+import pandas as pd
+import sys
+from pathlib import Path
+from unittest import mock
+
+# Add project root to path
+project_root = Path(__file__).parent.parent
+sys.path.append(str(project_root))
+
+from loadtest.run import run_load_test, DEFAULT_QUERY_MIX
+from search.local_parser import handle_simple_search
+from loadtest.stub_llm import StubLLMServer
+
+
+class TestLoadTest(unittest.TestCase):
+
+    def setUp(self):
+        self.df = pd.DataFrame({
+            'id': [1, 2, 3],
+            'name': ['Red Dress', 'Blue Jeans', 'Black Bag'],
+            'price': [150.0, 80.0, 120.0],
+            'color': ['red', 'blue', 'black'],
+            'category': ['dress', 'jeans', 'bag'],
+            'rating': [4.5, 4.2, 4.8]
+        })
+
+    def test_run_against_stub(self):
+        mix = [("dresses", 1), ("anything nice below $130", 1)]
+        with StubLLMServer(latency_ms=0, jitter_ms=0, seed=0) as stub:
+            env = {"OPENROUTER_BASE_URL": stub.base_url, "OPENROUTER_API_KEY": "stub-key"}
+            with mock.patch.dict(os.environ, env):
+                report = run_load_test(self.df, sessions=3, requests_per_session=4,
+                                       query_mix=mix, seed=0)
+
+            self.assertGreater(stub.request_count, 0)
+
+        self.assertEqual(report["sessions"], 3)
+        self.assertEqual(report["requests"], 12)
+        self.assertEqual(report["completed"], 12)
+        self.assertEqual(report["llm_requests"], stub.request_count)
+        self.assertGreater(report["throughput_rps"], 0)
+        self.assertLessEqual(report["latency_ms"]["p50"], report["latency_ms"]["p99"])
+        self.assertGreater(report["memory_per_session_bytes"], 0)
+
+    def test_stub_errors_are_counted_as_failures(self):
+        mix = [("anything nice below $130", 1)]
+        with StubLLMServer(latency_ms=0, jitter_ms=0, error_rate=1.0, seed=0) as stub:
+            env = {"OPENROUTER_BASE_URL": stub.base_url, "OPENROUTER_API_KEY": "stub-key"}
+            with mock.patch.dict(os.environ, env):
+                report = run_load_test(self.df, sessions=2, requests_per_session=2,
+                                       query_mix=mix, seed=0)
+
+        self.assertEqual(report["completed"], 0)
+        self.assertEqual(report["failed"], 4)
+
+    def test_runs_the_app_pipeline_with_shared_caches_and_inventory(self):
+        mix = [("anything nice below $130", 1)]
+        # A large catalog with nothing under $130, so sessions retain no result cards
+        catalog = pd.concat([self.df.assign(price=500.0)] * 2000, ignore_index=True)
+        with StubLLMServer(latency_ms=0, jitter_ms=0, seed=0) as stub:
+            env = {"OPENROUTER_BASE_URL": stub.base_url, "OPENROUTER_API_KEY": "stub-key"}
+            with mock.patch.dict(os.environ, env):
+                report = run_load_test(catalog, sessions=1, requests_per_session=3,
+                                       query_mix=mix, seed=0)
+
+            self.assertEqual(stub.request_count, 1)
+
+        self.assertEqual(report["llm_requests"], 1)
+        self.assertEqual(report["cached_requests"], 2)
+        # Sessions reference the one inventory rather than each holding a copy
+        self.assertGreater(report["shared_inventory_bytes"], 0)
+        self.assertLess(report["memory_per_session_bytes"], report["shared_inventory_bytes"])
+
+    def test_coalesce_shares_in_flight_parses(self):
+        mix = [("anything nice below $130", 1)]
+        with StubLLMServer(latency_ms=300, jitter_ms=0, seed=0) as stub:
+            env = {"OPENROUTER_BASE_URL": stub.base_url, "OPENROUTER_API_KEY": "stub-key"}
+            with mock.patch.dict(os.environ, env):
+                report = run_load_test(self.df, sessions=6, requests_per_session=1,
+                                       query_mix=mix, seed=0, coalesce=True)
+
+            self.assertEqual(report["completed"], 6)
+            self.assertEqual(report["llm_requests"], stub.request_count)
+            self.assertGreater(report["coalesced_requests"], 0)
+            self.assertEqual(report["llm_requests"] + report["coalesced_requests"], 6)
+
+    def test_default_mix_sends_about_half_past_the_local_parser(self):
+        total = sum(weight for _, weight in DEFAULT_QUERY_MIX)
+        needs_llm = sum(weight for query, weight in DEFAULT_QUERY_MIX if not handle_simple_search(query))
+        self.assertGreaterEqual(needs_llm / total, 0.4)
+        self.assertGreaterEqual(sum(1 for query, _ in DEFAULT_QUERY_MIX if not handle_simple_search(query)), 15)
+
+
+if __name__ == '__main__':
+    unittest.main()
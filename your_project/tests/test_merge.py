@@ -0,0 +1,121 @@
+import unittest
+import os
+import tempfile
+import pandas as pd
+import sys
+from pathlib import Path
+
+# Add project root to path
+project_root = Path(__file__).parent.parent
+sys.path.append(str(project_root))
+
+from inventory.merge import merge_feeds
+
+
+class TestMergeFeeds(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.primary = os.path.join(self.tmp.name, 'primary.csv')
+        self.supplier = os.path.join(self.tmp.name, 'supplier.csv')
+        self.output = os.path.join(self.tmp.name, 'catalog.csv')
+
+        pd.DataFrame({
+            'name': ['Red Dress', 'Blue Jeans', 'Red Dress'],
+            'category': ['dress', 'jeans', 'dress'],
+            'color': ['red', 'blue', 'red'],
+            'price': [150.0, 80.0, 155.0],
+            'updated_at': ['2024-01-01', '2024-01-01', '2024-01-02'],
+        }).to_csv(self.primary, index=False)
+
+        pd.DataFrame({
+            'name': ['red dress ', 'Black Jacket'],
+            'category': ['Dress', 'jacket'],
+            'color': ['red', 'black'],
+            'price': [140.0, 250.0],
+            'updated_at': ['2024-03-01', '2024-01-01'],
+            'rating': [4.1, 4.8],
+        }).to_csv(self.supplier, index=False)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_first_feed_wins_by_default(self):
+        stats = merge_feeds([self.primary, self.supplier], self.output, partitions=4, chunksize=1, workers=1)
+        merged = pd.read_csv(self.output)
+
+        self.assertEqual(stats['rows_in'], 5)
+        self.assertEqual(stats['rows_out'], 3)
+        self.assertEqual(stats['duplicates'], 2)
+        self.assertEqual(list(merged.columns), ['name', 'category', 'color', 'price', 'updated_at', 'rating'])
+        dress = merged[merged['category'].str.lower() == 'dress']
+        self.assertEqual(len(dress), 1)
+        self.assertEqual(dress.iloc[0]['price'], 150.0)
+
+    def test_precedence_rules(self):
+        merge_feeds([self.primary, self.supplier], self.output, precedence=[('updated_at', 'desc')],
+                    partitions=2, workers=2)
+        merged = pd.read_csv(self.output)
+
+        dress = merged[merged['category'].str.lower() == 'dress']
+        self.assertEqual(len(dress), 1)
+        self.assertEqual(dress.iloc[0]['price'], 140.0)
+        self.assertEqual(len(merged), 3)
+
+    def test_xlsx_feeds_are_streamed_in_chunks(self):
+        supplier = os.path.join(self.tmp.name, 'supplier.xlsx')
+        pd.read_csv(self.supplier).rename(columns={'name': 'Name'}).to_excel(supplier, index=False)
+
+        stats = merge_feeds([self.primary, supplier], self.output, chunksize=1, workers=1)
+        merged = pd.read_csv(self.output)
+        self.assertEqual(stats["rows_in"], 5)
+        self.assertEqual(sorted(merged['name']), ['Black Jacket', 'Blue Jeans', 'Red Dress'])
+
+    def test_sheets_with_different_column_order_are_aligned_by_name(self):
+        supplier = os.path.join(self.tmp.name, 'supplier.xlsx')
+        with pd.ExcelWriter(supplier) as writer:
+            pd.DataFrame({'name': ['A', 'B'], 'category': ['coat', 'coat'], 'color': ['red', 'red'],
+                          'price': [10, 20]}).to_excel(writer, sheet_name='one', index=False)
+            pd.DataFrame({'price': [30], 'color': ['blue'], 'name': ['C'], 'category': ['coat'],
+                          'rating': [4.0]}).to_excel(writer, sheet_name='two', index=False)
+
+        stats = merge_feeds([supplier], self.output, partitions=2, chunksize=1, workers=1)
+        merged = pd.read_csv(self.output).set_index('name')
+
+        self.assertEqual(stats['rows_out'], 3)
+        self.assertEqual(list(merged.columns), ['category', 'color', 'price', 'rating'])
+        self.assertEqual(merged.loc['C', 'price'], 30)
+        self.assertEqual(merged.loc['C', 'color'], 'blue')
+        self.assertEqual(merged.loc['C', 'rating'], 4.0)
+        self.assertTrue(pd.isna(merged.loc['A', 'rating']))
+
+    def test_csv_headers_are_normalized_like_spreadsheets(self):
+        supplier = os.path.join(self.tmp.name, 'supplier_upper.csv')
+        pd.read_csv(self.supplier).rename(columns=str.title).to_csv(supplier, index=False)
+
+        stats = merge_feeds([supplier], self.output, workers=1)
+        merged = pd.read_csv(self.output)
+
+        self.assertEqual(stats['rows_out'], 2)
+        self.assertEqual(stats['duplicates'], 0)
+        self.assertEqual(sorted(merged['name'].str.strip()), ['Black Jacket', 'red dress'])
+
+    def test_missing_key_column_is_an_error(self):
+        with self.assertRaisesRegex(ValueError, "sku"):
+            merge_feeds([self.primary], self.output, key_columns=['name', 'SKU'], workers=1)
+        self.assertFalse(os.path.exists(self.output))
+
+    def test_rejects_feeds_that_cannot_be_streamed(self):
+        legacy = os.path.join(self.tmp.name, 'legacy.xls')
+        open(legacy, 'wb').close()
+        with self.assertRaisesRegex(ValueError, "convert"):
+            merge_feeds([self.primary, legacy], self.output)
+        self.assertFalse(os.path.exists(self.output))
+
+    def test_rejects_unknown_output_format(self):
+        with self.assertRaises(ValueError):
+            merge_feeds([self.primary], os.path.join(self.tmp.name, 'catalog.xlsx'))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,87 @@
+import unittest
+import numpy as np
+import pandas as pd
+import sys
+from pathlib import Path
+
+# Add project root to path
+project_root = Path(__file__).parent.parent
+sys.path.append(str(project_root))
+
+from inventory.filters import filter_products
+from inventory.price_rating_index import PriceRatingIndex, is_band_query, best_in_budget
+from search.pipeline import build_product_cards
+
+
+class TestPriceRatingIndex(unittest.TestCase):
+
+    def setUp(self):
+        rng = np.random.default_rng(7)
+        n = 500
+        ratings = np.round(rng.uniform(3.0, 5.0, n), 1)
+        ratings[rng.choice(n, 20, replace=False)] = np.nan
+        self.df = pd.DataFrame({
+            'name': [f'Product {i}' for i in range(n)],
+            'category': rng.choice(['dress', 'Shoes', 'bag'], n),
+            'price': np.round(rng.uniform(5, 300, n), 2),
+            'rating': ratings,
+        })
+        self.index = PriceRatingIndex(self.df)
+
+    def brute_force(self, category=None, price_min=None, price_max=None, min_rating=None):
+        filters = {'category': category, 'price_min': price_min, 'price_max': price_max, 'min_rating': min_rating}
+        return filter_products(self.df, filters)
+
+    def test_count_matches_brute_force(self):
+        rng = np.random.default_rng(1)
+        for _ in range(200):
+            category = rng.choice([None, 'dress', 'shoes', 'bag', 'coat'])
+            low, high = sorted(rng.uniform(0, 320, 2))
+            min_rating = rng.choice([None, 3.5, 3.7, 4.0, 4.3, 4.8])
+            expected = len(self.brute_force(category, low, high, min_rating))
+            self.assertEqual(self.index.count(category, low, high, min_rating), expected)
+
+    def test_top_k_is_best_rated_in_band(self):
+        rows, well_under = self.index.top_k('dress', price_max=150, k=10, min_rating=4.0)
+        top = self.df.iloc[rows]
+
+        expected = self.brute_force('dress', price_max=150, min_rating=4.0)
+        expected = expected.sort_values(['rating', 'price'], ascending=[False, True]).head(10)
+        self.assertEqual(list(top['rating']), list(expected['rating']))
+        self.assertTrue((top['price'] <= 150).all())
+        self.assertEqual(list(well_under), list(top['price'] <= 120))
+
+    def test_best_in_budget_returns_all_matches_sorted(self):
+        filters = {'category': 'bag', 'price_max': 100.0}
+        self.assertTrue(is_band_query(filters))
+        result, well_under = best_in_budget(self.df, filters, self.index)
+
+        self.assertEqual(sorted(result.index), sorted(self.brute_force('bag', price_max=100.0).index))
+        ratings = result['rating'].fillna(-1).to_numpy()
+        self.assertTrue((ratings[:-1] >= ratings[1:]).all())
+
+        cards = build_product_cards(result, filters, well_under)
+        for card, flag in zip(cards, well_under):
+            self.assertEqual('well under your budget' in card['reason'], bool(flag))
+
+    def test_all_categories_index_is_built_on_first_use(self):
+        index = PriceRatingIndex(self.df)
+        self.assertIsNone(index._all)
+        index.count('dress', price_max=100)
+        self.assertIsNone(index._all)
+        self.assertEqual(index.count(price_max=100), len(self.brute_force(price_max=100)))
+        self.assertIsNotNone(index._all)
+
+    def test_index_for_another_inventory_is_rejected(self):
+        with self.assertRaises(ValueError):
+            best_in_budget(self.df.head(10), {'price_max': 100.0}, self.index)
+
+    def test_is_band_query(self):
+        self.assertFalse(is_band_query({'category': 'dress'}))
+        self.assertFalse(is_band_query({'price_max': 100, 'color': 'red'}))
+        self.assertFalse(is_band_query({'category': ['dress', 'bag'], 'price_max': 100}))
+        self.assertTrue(is_band_query({'price_min': 10, 'min_rating': 4.5, 'color': None}))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,80 @@
+import unittest
+import tempfile
+import pandas as pd
+import sys
+from pathlib import Path
+
+# Add project root to path
+project_root = Path(__file__).parent.parent
+sys.path.append(str(project_root))
+
+from inventory.filters import filter_products
+from search.cache import parse_cache, filter_cache
+from search.query_log import QueryLogWriter, iter_log_records, aggregate_top_queries, warm_caches
+
+
+class TestQueryLog(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.log_dir = self.tmp.name
+        parse_cache.clear()
+        filter_cache.clear()
+
+    def tearDown(self):
+        self.tmp.cleanup()
+        parse_cache.clear()
+        filter_cache.clear()
+
+    def write_records(self, records, **kwargs):
+        writer = QueryLogWriter(self.log_dir, flush_interval=0.01, **kwargs)
+        for record in records:
+            writer.log(record)
+        writer.close()
+        return writer
+
+    def test_writer_flushes_and_rotates(self):
+        records = [{"query": f"query {i}", "filters": {"price_max": i}, "source": "llm"} for i in range(50)]
+        writer = self.write_records(records, max_segment_bytes=200, batch_size=5)
+
+        self.assertEqual(writer.written, 50)
+        self.assertGreater(len(list(Path(self.log_dir).glob("queries-*.jsonl"))), 1)
+        logged = list(iter_log_records(self.log_dir))
+        self.assertEqual([r["query"] for r in logged], [r["query"] for r in records])
+        self.assertIn("ts", logged[0])
+
+    def test_aggregate_top_queries(self):
+        self.write_records([
+            {"query": "Red Dress", "filters": {"category": "dress", "color": "red"}, "source": "llm"},
+            {"query": "red  dress ", "filters": {"category": "dress", "color": "red"}, "source": "llm"},
+            {"query": "red dress", "filters": {"category": "dress"}, "source": "local"},
+            {"query": "shoes", "filters": {"category": "shoes"}, "source": "local"},
+        ])
+
+        top = aggregate_top_queries(self.log_dir, n=1)
+        self.assertEqual(len(top), 1)
+        self.assertEqual(top[0]["query"], "red dress")
+        self.assertEqual(top[0]["count"], 3)
+        self.assertEqual(top[0]["filters"], {"category": "dress", "color": "red"})
+        self.assertEqual(top[0]["source"], "llm")
+
+    def test_warm_caches(self):
+        df = pd.DataFrame({
+            'name': ['Red Dress', 'Blue Jeans'],
+            'price': [150.0, 80.0],
+            'color': ['red', 'blue'],
+            'category': ['dress', 'jeans'],
+            'rating': [4.5, 4.2]
+        })
+        top = [
+            {"query": "Red Dress", "count": 3, "filters": {"color": "red"}},
+            {"query": "gibberish", "count": 2, "filters": None},
+        ]
+
+        self.assertEqual(warm_caches(top, df, filter_products), 1)
+        self.assertEqual(parse_cache.get("red dress"), {"color": "red"})
+        self.assertEqual(list(filter_cache.get(df, {"color": "red"})['name']), ['Red Dress'])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,142 @@
+import unittest
+import os
+import tempfile
+import numpy as np
+import pandas as pd
+import sys
+from pathlib import Path
+
+# Add project root to path
+project_root = Path(__file__).parent.parent
+sys.path.append(str(project_root))
+
+from inventory.similar import (
+    SimilarItems, build_similar_items, update_similar_items, load_similar_items, catalog_fingerprint, store_path
+)
+
+WORDS = ['summer', 'classic', 'slim', 'leather', 'cotton', 'wool', 'floral', 'running', 'denim', 'tote']
+
+
+def make_catalog(n, seed, suffix=''):
+    rng = np.random.default_rng(seed)
+    return pd.DataFrame({
+        'name': [' '.join(rng.choice(WORDS, 2)) + f' {i}{suffix}' for i in range(n)],
+        'category': rng.choice(['dress', 'shoes', 'bag'], n),
+        'color': rng.choice(['red', 'blue', 'black', None], n),
+        'price': np.round(rng.uniform(5, 300, n), 2),
+        'rating': np.round(rng.uniform(3, 5, n), 2),
+    })
+
+
+class TestSimilarItems(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.df = make_catalog(400, seed=0)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_neighbours_are_best_scored_in_category(self):
+        items = build_similar_items(self.df, k=5)
+        for product_id in [0, 17, 250]:
+            neighbours = items.similar_products(product_id)
+            self.assertEqual(len(neighbours), 5)
+            self.assertNotIn(product_id, neighbours)
+            categories = self.df['category'].iloc[neighbours]
+            self.assertTrue((categories == self.df['category'].iloc[product_id]).all())
+
+            start, end = items.indptr[product_id], items.indptr[product_id + 1]
+            scores = items.scores[start:end]
+            self.assertTrue((scores[:-1] >= scores[1:]).all())
+
+        self.assertEqual(len(items.similar_products(3, k=2)), 2)
+
+    def test_similar_names_and_prices_rank_first(self):
+        df = pd.DataFrame({
+            'name': ['Red Summer Dress', 'Red Summer Dress Long', 'Wool Coat Dress', 'Red Summer Dress'],
+            'category': ['dress', 'dress', 'dress', 'shoes'],
+            'color': ['red', 'red', 'grey', 'red'],
+            'price': [100.0, 110.0, 400.0, 100.0],
+            'rating': [4.5, 4.4, 3.0, 4.5],
+        })
+        items = build_similar_items(df, k=5)
+        self.assertEqual(list(items.similar_products(0)), [1, 2])
+        self.assertEqual(len(items.similar_products(3)), 0)
+        self.assertEqual(items.product_id('Wool Coat Dress', 'Dress', 'Grey'), 2)
+
+    def test_store_loads_memory_mapped(self):
+        build_similar_items(self.df, k=5).save(self.tmp.name)
+        items = SimilarItems.load(self.tmp.name)
+
+        self.assertIsInstance(items.indices, np.memmap)
+        self.assertEqual(items.indices.dtype, np.int32)
+        self.assertEqual(items.indptr.dtype, np.int32)
+        self.assertEqual(list(items.similar_products(42)), list(build_similar_items(self.df, k=5).similar_products(42)))
+
+    def test_incremental_update_matches_full_rebuild(self):
+        update_similar_items(self.df, self.tmp.name, k=5)
+
+        changed = self.df.copy()
+        changed.loc[[3, 50, 120], 'price'] *= 1.5
+        changed = changed.drop(index=[7, 300])
+        changed = pd.concat([changed, make_catalog(5, seed=1, suffix=' new')], ignore_index=True)
+
+        items, recomputed = update_similar_items(changed, self.tmp.name, k=5)
+        self.assertLess(recomputed, len(changed))
+
+        full = build_similar_items(changed, k=5)
+        self.assertEqual(list(items.indptr), list(full.indptr))
+        self.assertEqual(list(items.indices), list(full.indices))
+
+    def test_incremental_update_matches_full_rebuild_with_ties(self):
+        # Coarse prices and ratings make many scores tie at the K-th place
+        for seed in range(5):
+            rng = np.random.default_rng(seed)
+            df = make_catalog(300, seed=seed)
+            df['price'] = rng.choice([20.0, 40.0, 80.0], len(df))
+            df['rating'] = rng.choice([4.0, 4.5], len(df))
+            with tempfile.TemporaryDirectory() as store:
+                update_similar_items(df, store, k=5)
+
+                changed = df.drop(index=rng.choice(len(df), 30, replace=False))
+                if seed % 2:
+                    changed = changed.sample(frac=1.0, random_state=seed)
+                changed = changed.reset_index(drop=True)
+                changed.loc[int(rng.integers(len(changed))), 'price'] = 40.0 if seed % 2 else 60.0
+                changed = pd.concat([changed, make_catalog(3, seed=seed + 10, suffix=' new')], ignore_index=True)
+
+                items, recomputed = update_similar_items(changed, store, k=5)
+                full = build_similar_items(changed, k=5)
+                self.assertEqual(list(items.indptr), list(full.indptr), seed)
+                self.assertEqual(list(items.indices), list(full.indices), seed)
+                self.assertLess(recomputed, len(changed), seed)
+
+    def test_load_only_reads_the_store_built_for_the_catalog(self):
+        self.assertIsNone(load_similar_items(self.df, self.tmp.name))
+        built, _ = update_similar_items(self.df, self.tmp.name, k=5)
+
+        loaded = load_similar_items(self.df, self.tmp.name)
+        self.assertEqual(list(loaded.indices), list(built.indices))
+        self.assertEqual(update_similar_items(self.df, self.tmp.name, k=5)[1], 0)
+
+        # Another catalog gets its own store and leaves the first one alone
+        other = make_catalog(50, seed=2)
+        self.assertIsNone(load_similar_items(other, self.tmp.name))
+        update_similar_items(other, self.tmp.name, k=5)
+        self.assertEqual(len(load_similar_items(other, self.tmp.name)), 50)
+        self.assertEqual(len(load_similar_items(self.df, self.tmp.name)), 400)
+        self.assertEqual(len(os.listdir(self.tmp.name)), 2)
+
+    def test_update_starts_from_the_latest_store(self):
+        update_similar_items(self.df, self.tmp.name, k=5)
+        changed = self.df.copy()
+        changed.loc[10, 'price'] *= 2
+        items, recomputed = update_similar_items(changed, self.tmp.name, k=5)
+
+        self.assertLess(recomputed, len(changed))
+        self.assertEqual(items.meta['catalog'], catalog_fingerprint(changed))
+        self.assertTrue(os.path.isdir(store_path(catalog_fingerprint(changed), self.tmp.name)))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,130 @@
+import unittest
+import time
+import threading
+import sys
+from pathlib import Path
+from unittest import mock
+
+# Add project root to path
+project_root = Path(__file__).parent.parent
+sys.path.append(str(project_root))
+
+import pandas as pd
+
+from search import pipeline
+from search.cache import parse_cache, filter_cache
+from search.singleflight import SingleFlight, SingleFlightTimeout, PARSE_TIMEOUT_SECONDS
+
+
+def run_concurrently(n, target):
+    """Start n threads on target together and collect what each returns or raises"""
+    barrier = threading.Barrier(n)
+    outcomes = [None] * n
+
+    def worker(i):
+        barrier.wait()
+        try:
+            outcomes[i] = ('ok', target())
+        except Exception as e:
+            outcomes[i] = ('error', e)
+
+    threads = [threading.Thread(target=worker, args=(i,)) for i in range(n)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return outcomes
+
+
+class TestSingleFlight(unittest.TestCase):
+
+    def test_identical_calls_share_one_execution(self):
+        flights = SingleFlight('test')
+        calls = []
+
+        def parse():
+            calls.append(1)
+            time.sleep(0.2)
+            return {'category': 'dress'}
+
+        outcomes = run_concurrently(8, lambda: flights.do('red dress', parse))
+
+        self.assertEqual(len(calls), 1)
+        results = [value for status, value in outcomes]
+        self.assertTrue(all(status == 'ok' for status, _ in outcomes))
+        self.assertTrue(all(result == {'category': 'dress'} for result, _ in results))
+        self.assertEqual(sum(shared for _, shared in results), 7)
+        self.assertEqual(flights.stats(), {'executed': 1, 'collapsed': 7, 'failed': 0, 'timed_out': 0, 'in_flight': 0})
+
+        # Once finished, the next call runs again
+        self.assertEqual(flights.do('red dress', parse), ({'category': 'dress'}, False))
+        self.assertEqual(len(calls), 2)
+
+    def test_failure_reaches_every_waiter(self):
+        flights = SingleFlight('test')
+
+        def fail():
+            time.sleep(0.2)
+            raise RuntimeError('LLM unavailable')
+
+        outcomes = run_concurrently(4, lambda: flights.do('shoes', fail))
+
+        self.assertTrue(all(status == 'error' and str(e) == 'LLM unavailable' for status, e in outcomes))
+        self.assertEqual(flights.stats()['failed'], 1)
+        self.assertEqual(flights.stats()['collapsed'], 3)
+
+    def test_waiters_time_out_and_expired_flights_are_replaced(self):
+        flights = SingleFlight('test', timeout=0.1)
+        release = threading.Event()
+        leader = threading.Thread(target=flights.do, args=('slow', lambda: release.wait(2) and 'late'))
+        leader.start()
+        time.sleep(0.02)
+
+        with self.assertRaises(SingleFlightTimeout):
+            flights.do('slow', lambda: 'unused')
+        self.assertEqual(flights.stats()['timed_out'], 1)
+
+        # The hung flight no longer accepts waiters; a new call runs on its own
+        time.sleep(0.1)
+        self.assertEqual(flights.do('slow', lambda: 'fresh'), ('fresh', False))
+
+        release.set()
+        leader.join()
+        self.assertEqual(flights.stats()['in_flight'], 0)
+
+    def test_waiter_timeout_falls_back_without_calling_the_llm(self):
+        parse_cache.clear()
+        filter_cache.clear()
+        df = pd.DataFrame({'name': ['Red Dress', 'Blue Jeans'], 'price': [150.0, 80.0],
+                           'category': ['dress', 'jeans'], 'rating': [4.5, 4.2]})
+        intent_model = mock.Mock()
+        intent_model.predict.return_value = ({'category': 'dress'}, 0.95)
+        timeout = SingleFlightTimeout('parse: timed out')
+        with mock.patch.object(pipeline.parse_flights, 'do', side_effect=timeout), \
+                mock.patch.object(pipeline.filter_flights, 'do', side_effect=timeout), \
+                mock.patch.object(pipeline, 'parse_query') as parse_query:
+            result = pipeline.run_search('something for a wedding', df, intent_model=intent_model)
+            self.assertEqual(result['source'], 'model')
+            self.assertEqual(list(result['filtered_df']['name']), ['Red Dress'])
+
+            # Without a confident model the search comes back empty rather than calling the LLM again
+            intent_model.predict.return_value = ({'category': 'dress'}, 0.2)
+            result = pipeline.run_search('something for a party', df, intent_model=intent_model)
+            self.assertEqual((result['filters'], result['source']), ({}, 'timeout'))
+
+        parse_query.assert_not_called()
+        parse_cache.clear()
+        filter_cache.clear()
+
+    def test_llm_request_gives_up_before_waiters_do(self):
+        from llm import handler
+
+        with mock.patch.dict('os.environ', {'OPENROUTER_API_KEY': 'test-key'}), \
+                mock.patch.object(handler.requests, 'post', side_effect=handler.requests.exceptions.Timeout) as post:
+            self.assertEqual(handler.parse_query('red dress'), {})
+
+        connect, read = post.call_args.kwargs['timeout']
+        self.assertLess(connect + read, PARSE_TIMEOUT_SECONDS)
+
+if __name__ == '__main__':
+    unittest.main()
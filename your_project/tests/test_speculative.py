@@ -0,0 +1,75 @@
+import unittest
+import time
+import pandas as pd
+import sys
+from pathlib import Path
+
+# Add project root to path
+project_root = Path(__file__).parent.parent
+sys.path.append(str(project_root))
+
+from inventory.filters import filter_products
+from search.local_parser import handle_simple_search
+from search.speculative import SpeculativeSearch
+
+
+class TestSpeculativeSearch(unittest.TestCase):
+
+    def setUp(self):
+        self.df = pd.DataFrame({
+            'id': [1, 2, 3],
+            'name': ['Red Dress', 'Blue Jeans', 'Black Jacket'],
+            'price': [150.0, 80.0, 250.0],
+            'color': ['red', 'blue', 'black'],
+            'category': ['dress', 'jeans', 'jacket'],
+            'rating': [4.5, 4.2, 4.8]
+        })
+
+    def wait_for(self, condition, timeout=2.0):
+        deadline = time.time() + timeout
+        while time.time() < deadline:
+            if condition():
+                return True
+            time.sleep(0.01)
+        return False
+
+    def test_precomputes_filters_and_results(self):
+        speculative = SpeculativeSearch(handle_simple_search, filter_products, debounce_seconds=0.01)
+        speculative.update("  Dresses ", self.df)
+
+        self.assertTrue(self.wait_for(lambda: speculative.lookup_filters("dresses") is not None))
+        filters = speculative.lookup_filters("dresses")
+        self.assertEqual(filters, {'category': 'dress'})
+
+        result = speculative.lookup_results(self.df, filters)
+        self.assertIsNotNone(result)
+        self.assertEqual(list(result['name']), ['Red Dress'])
+
+        # Results are tied to the inventory they were computed on
+        self.assertIsNone(speculative.lookup_results(self.df.copy(), filters))
+
+    def test_newer_input_cancels_pending_work(self):
+        calls = []
+
+        def parse(query):
+            calls.append(query)
+            return handle_simple_search(query)
+
+        speculative = SpeculativeSearch(parse, filter_products, debounce_seconds=0.05)
+        speculative.update("dre", self.df)
+        speculative.update("jeans", self.df)
+
+        self.assertTrue(self.wait_for(lambda: speculative.lookup_filters("jeans") is not None))
+        self.assertEqual(calls, ['jeans'])
+        self.assertIsNone(speculative.lookup_filters("dre"))
+
+    def test_cancel_discards_pending_work(self):
+        speculative = SpeculativeSearch(handle_simple_search, filter_products, debounce_seconds=0.05)
+        speculative.update("dress", self.df)
+        speculative.cancel()
+        time.sleep(0.15)
+        self.assertIsNone(speculative.lookup_filters("dress"))
+
+
+if __name__ == '__main__':
+    unittest.main()